@@ -1,6 +1,8 @@
 import pygame
 import sys
 import math
+from hud import HUD
+from fixed_timestep import FixedTimestep
 
 # Initialize pygame
 pygame.init()
@@ -21,6 +23,9 @@ GREEN = (0, 255, 0)
 # Frame rate control
 clock = pygame.time.Clock()
 FPS = 60
+# Fixed simulation step (seconds): timers, gravity and animation advance per step,
+# so the game runs at the same speed whatever the render frame rate
+SIM_STEP = 1 / 60
 
 class StickMan:
     def __init__(self, x, y, color, flip=False):
@@ -55,7 +60,14 @@ class StickMan:
         self.facing_right = not flip
         self.animation_frame = 0
         
+        # Positions at the end of the last two simulation steps, interpolated when drawing
+        self._prev_position = (x, y)
+        self._position = (x, y)
+        
     def update(self, other):
+        """
+        Advance one simulation step
+        """
         self.animation_frame += 0.2
         
         # Jump physics
@@ -99,6 +111,9 @@ class StickMan:
                 self.defending = False
                 self.defense_timer = 0
                 self.head_scale = 1.0
+        
+        self._prev_position = self._position
+        self._position = (self.x, self.y)
     
     def jump(self):
         if not self.is_jumping:
@@ -121,13 +136,22 @@ class StickMan:
             if self.health < 0:
                 self.health = 0
     
-    def draw(self):
+    def render_position(self, alpha=None):
+        """
+        :param alpha: fraction of the way from the previous step to the current one (FixedTimestep.alpha),
+                      None draws at the current position
+        """
+        if alpha is None:
+            return self.x, self.y
+        (x0, y0), (x1, y1) = self._prev_position, self._position
+        return x0 + (x1 - x0) * alpha, y0 + (y1 - y0) * alpha
+    
+    def draw(self, alpha=None):
         head_radius = 15 * self.head_scale
         body_length = 60
         leg_length = 50
         
-        head_x = self.x
-        head_y = self.y
+        head_x, head_y = self.render_position(alpha)
         
         punch_x_offset = self.arm_length if not self.flip else -self.arm_length
         punch_radius = 8 * self.punch_scale if self.attacking else 8
@@ -180,10 +204,18 @@ class StickMan:
 player1 = StickMan(200, 400, RED)
 player2 = StickMan(600, 400, BLUE, flip=True)
 
+# Ground, health bar frames and controls hint are drawn once into the HUD background
+hud = HUD(WIDTH, HEIGHT, 450, (RED, BLUE), hints=[
+    ("Player 1: F - Attack, G - Defend, W - Jump", (10, HEIGHT - 30)),
+    ("Player 2: K - Attack, L - Defend, ↑ - Jump", (WIDTH - 270, HEIGHT - 30)),
+])
+
+timestep = FixedTimestep(SIM_STEP)
+
 # Main game loop
 running = True
 while running:
-    screen.fill(WHITE)
+    screen.blit(hud.background, (0, 0))
     
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
@@ -191,85 +223,68 @@ while running:
     
     keys = pygame.key.get_pressed()
     
-    # Player 1 controls
-    player1.is_moving = False
-    if keys[pygame.K_a]:
-        player1.x -= 5
-        player1.is_moving = True
-        player1.facing_right = False
-    if keys[pygame.K_d]:
-        player1.x += 5
-        player1.is_moving = True
-        player1.facing_right = True
-    if keys[pygame.K_w]:
-        player1.jump()
-    if keys[pygame.K_f]:
-        player1.attack()
-    if keys[pygame.K_g]:
-        player1.defend()
-    
-    # Player 2 controls
-    player2.is_moving = False
-    if keys[pygame.K_LEFT]:
-        player2.x -= 5
-        player2.is_moving = True
-        player2.facing_right = False
-    if keys[pygame.K_RIGHT]:
-        player2.x += 5
-        player2.is_moving = True
-        player2.facing_right = True
-    if keys[pygame.K_UP]:
-        player2.jump()
-    if keys[pygame.K_k]:
-        player2.attack()
-    if keys[pygame.K_l]:
-        player2.defend()
-    
-    # Keep players inside the screen
-    player1.x = max(50, min(player1.x, WIDTH - 50))
-    player2.x = max(50, min(player2.x, WIDTH - 50))
-    
-    player1.update(player2)
-    player2.update(player1)
+    # Run 0 or more fixed steps for the real time that has passed; the key state read
+    # this frame is applied on every step
+    for _ in range(timestep.advance()):
+        # Player 1 controls
+        player1.is_moving = False
+        if keys[pygame.K_a]:
+            player1.x -= 5
+            player1.is_moving = True
+            player1.facing_right = False
+        if keys[pygame.K_d]:
+            player1.x += 5
+            player1.is_moving = True
+            player1.facing_right = True
+        if keys[pygame.K_w]:
+            player1.jump()
+        if keys[pygame.K_f]:
+            player1.attack()
+        if keys[pygame.K_g]:
+            player1.defend()
     
-    player1.check_hit(player2)
-    player2.check_hit(player1)
+        # Player 2 controls
+        player2.is_moving = False
+        if keys[pygame.K_LEFT]:
+            player2.x -= 5
+            player2.is_moving = True
+            player2.facing_right = False
+        if keys[pygame.K_RIGHT]:
+            player2.x += 5
+            player2.is_moving = True
+            player2.facing_right = True
+        if keys[pygame.K_UP]:
+            player2.jump()
+        if keys[pygame.K_k]:
+            player2.attack()
+        if keys[pygame.K_l]:
+            player2.defend()
     
-    # Draw ground
-    pygame.draw.line(screen, BLACK, (0, 450), (WIDTH, 450), 5)
+        # Keep players inside the screen
+        player1.x = max(50, min(player1.x, WIDTH - 50))
+        player2.x = max(50, min(player2.x, WIDTH - 50))
     
-    # Draw health bars
-    health_bar_width = 200
-    health_bar_height = 20
-    health_x1 = 50
-    health_y = 30
-    pygame.draw.rect(screen, BLACK, (health_x1, health_y, health_bar_width, health_bar_height))
-    pygame.draw.rect(screen, RED, (health_x1, health_y, (player1.health / 100) * health_bar_width, health_bar_height))
+        player1.update(player2)
+        player2.update(player1)
     
-    health_x2 = WIDTH - 50 - health_bar_width
-    pygame.draw.rect(screen, BLACK, (health_x2, health_y, health_bar_width, health_bar_height))
-    pygame.draw.rect(screen, BLUE, (health_x2, health_y, (player2.health / 100) * health_bar_width, health_bar_height))
+        player1.check_hit(player2)
+        player2.check_hit(player1)
     
-    # Draw players
-    player1.draw()
-    player2.draw()
+    # Draw health bars (re-rendered only when health changes)
+    hud.draw_health_bars(screen, player1.health, player2.health)
     
-    # Controls hint
-    font = pygame.font.SysFont(None, 24)
-    attack_text1 = font.render("Player 1: F - Attack, G - Defend, W - Jump", True, BLACK)
-    attack_text2 = font.render("Player 2: K - Attack, L - Defend, ↑ - Jump", True, BLACK)
-    screen.blit(attack_text1, (10, HEIGHT - 30))
-    screen.blit(attack_text2, (WIDTH - 270, HEIGHT - 30))
+    # Draw players, interpolated between the last two simulation steps
+    player1.draw(timestep.alpha)
+    player2.draw(timestep.alpha)
     
     # Win condition
     if player1.health <= 0 or player2.health <= 0:
-        font = pygame.font.SysFont(None, 72)
         if player1.health <= 0 and player2.health <= 0:
-            text = font.render("Draw!", True, BLACK)
+            text = hud.text("Draw!", 72, BLACK)
         elif player1.health <= 0:
-            text = font.render("Blue Wins!", True, BLUE)
+            text = hud.text("Blue Wins!", 72, BLUE)
         else:
-            text = font.render("Red Wins!", True, RED)
+            text = hud.text("Red Wins!", 72, RED)
         
         screen.blit(text, text.get_rect(center=(WIDTH//2, HEIGHT//2)))
         pygame.display.flip()
@@ -1,8 +1,10 @@
 import cv2
 from head_and_hand import HandAndHeadControl  # 导入 HandAndHeadControl 类
+from landmark_overlay import LandmarkOverlay
 
 # 初始化 HandAndHeadControl 类
 hand_and_head_control = HandAndHeadControl()
+landmark_overlay = LandmarkOverlay()  # 调试用的关键点叠加层
 
 # 打开摄像头
 cap = cv2.VideoCapture(0)
@@ -13,8 +15,9 @@ while True:
         break
 
     # 获取手部数据和头部中心坐标
-    hands = hand_and_head_control.get_hands(frame)
-    head_center = hand_and_head_control.get_head_center(frame)
+    result = hand_and_head_control.process(frame)
+    hands, head_center = result.hands, result.head
+    frame = landmark_overlay.draw(frame, result)
 
     # 打印每次获取到的坐标
     print("Left Hand Center:", hands['left'])
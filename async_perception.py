@@ -0,0 +1,206 @@
+# async_perception.py
+import os
+import time
+
+import cv2
+import mediapipe as mp
+from mediapipe.tasks import python as mp_tasks
+from mediapipe.tasks.python import vision
+
+from head_and_hand import (ConstantVelocityPredictor, DetectionScheduler, PerceptionResult, landmarks_center,
+                           to_frame_coords)
+from perception_backends import landmarks_to_array
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+HAND_MODEL_PATH = os.path.join(MODEL_DIR, "hand_landmarker.task")
+FACE_MODEL_PATH = os.path.join(MODEL_DIR, "face_landmarker.task")
+
+
+class AsyncHandAndHeadControl:
+    """
+    基于 MediaPipe Tasks LIVE_STREAM 模式的异步识别。
+    submit() 只把帧交给模型就立即返回，结果在回调里写进“最新结果”槽位，游戏循环用 poll() 取。
+    模型还在处理上一帧时新帧直接丢弃，不排队，所以渲染循环的节奏不受推理延迟影响。
+
+    需要先下载模型文件放到 models/ 目录：hand_landmarker.task、face_landmarker.task
+    """
+
+    def __init__(self, hand_model_path=HAND_MODEL_PATH, face_model_path=FACE_MODEL_PATH,
+                 min_detection_confidence=0.8, min_tracking_confidence=0.8, backend=None, inference_size=None,
+                 hands_interval=1, face_interval=1, prediction_max_age=0.5):
+        """
+        backend、inference_size、hands_interval、face_interval、prediction_max_age 和 HandAndHeadControl
+        的同名参数含义相同，方便两种识别方式共用一份配置
+        :param backend: 只支持 None 或 'hands_face_mesh'，其他后端没有对应的 Tasks 模型
+        :param inference_size: 送进模型的最大尺寸 (width, height)，返回的坐标仍是原始帧的像素坐标
+        :param hands_interval: 手部模型每隔多少帧运行一次，跳过的帧用恒速预测补上
+        :param face_interval: 面部模型每隔多少帧运行一次，跳过的帧用恒速预测补上
+        :param prediction_max_age: 跳过的帧上最多用多久以前的测量做外推（秒）
+        """
+        if backend not in (None, 'hands_face_mesh'):
+            raise ValueError(f"异步识别只支持 hands_face_mesh 后端，不支持: {backend}")
+        self.inference_size = inference_size
+        self.scheduler = DetectionScheduler({'hands': hands_interval, 'face': face_interval})
+        self._predictors = {name: ConstantVelocityPredictor(max_age=prediction_max_age)
+                            for name in ('head', 'left', 'right')}
+        running_mode = vision.RunningMode.LIVE_STREAM
+
+        hand_options = vision.HandLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(model_asset_path=hand_model_path),
+            running_mode=running_mode,
+            num_hands=2,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_hands,
+        )
+        face_options = vision.FaceLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(model_asset_path=face_model_path),
+            running_mode=running_mode,
+            num_faces=1,
+            min_face_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_face,
+        )
+        self.hand_landmarker = vision.HandLandmarker.create_from_options(hand_options)
+        self.face_landmarker = vision.FaceLandmarker.create_from_options(face_options)
+
+        # 每个模型是否还有没返回的帧；回调线程在发布结果之后清零，submit() 只在两者都空闲时提交
+        self._hands_busy = False
+        self._face_busy = False
+
+        # 回调写入的部分结果：(timestamp_ms, 数据)，两个模型的时间戳对上后合成一个结果
+        self._hands_part = None
+        self._face_part = None
+
+        # 正在处理的那一帧的 (timestamp_ms, 采集时间, 帧宽, 帧高, 每个部位这一帧是否实际运行了模型)
+        self._frame_info = None
+        self._last_timestamp_ms = -1
+
+        # 最新结果槽位：整体替换一个元组引用，读写都不需要加锁
+        self._latest = None
+        self._polled_timestamp_ms = -1
+
+        self.dropped_frames = 0
+
+    def submit(self, frame, capture_time=None):
+        """
+        把一帧交给两个模型异步识别
+        :param frame: BGR 图像帧
+        :param capture_time: 帧的采集时间戳（time.perf_counter 秒）
+        :return: True 表示已提交，False 表示模型还在忙、这一帧被丢弃
+        """
+        if self._hands_busy or self._face_busy:
+            self.dropped_frames += 1
+            return False
+        if capture_time is None:
+            capture_time = time.perf_counter()
+
+        # LIVE_STREAM 要求时间戳严格单调递增（毫秒）
+        timestamp_ms = max(int(capture_time * 1000), self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+
+        height, width = frame.shape[:2]
+        due = self.scheduler.tick()
+        measured = {'head': 'face' in due, 'left': 'hands' in due, 'right': 'hands' in due}
+        self._frame_info = (timestamp_ms, capture_time, width, height, measured)
+        # 跳过的模型这一帧没有测量，_publish() 用恒速预测补上
+        if 'hands' not in due:
+            self._hands_part = (timestamp_ms, None)
+        if 'face' not in due:
+            self._face_part = (timestamp_ms, None)
+        if not due:
+            self._publish(timestamp_ms)
+            return True
+
+        # 模型输出归一化坐标，缩小输入不影响映射回原始帧
+        rgb_frame = cv2.cvtColor(self._resize(frame), cv2.COLOR_BGR2RGB)
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+
+        self._hands_busy = 'hands' in due
+        self._face_busy = 'face' in due
+        if 'hands' in due:
+            self.hand_landmarker.detect_async(image, timestamp_ms)
+        if 'face' in due:
+            self.face_landmarker.detect_async(image, timestamp_ms)
+        return True
+
+    def _resize(self, frame):
+        """
+        按 inference_size 等比缩小；不需要缩小时原样返回
+        """
+        if self.inference_size is None:
+            return frame
+        height, width = frame.shape[:2]
+        scale = min(self.inference_size[0] / width, self.inference_size[1] / height)
+        if scale >= 1.0:
+            return frame
+        size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def _on_hands(self, result, output_image, timestamp_ms):
+        hands = {'left': None, 'right': None}
+        for landmarks, handedness in zip(result.hand_landmarks, result.handedness):
+            side = handedness[0].category_name.lower()  # 'left' 或 'right'
+            if side in hands:
+                hands[side] = landmarks_to_array(landmarks)
+        self._hands_part = (timestamp_ms, hands)
+        self._publish(timestamp_ms)
+        self._hands_busy = False
+
+    def _on_face(self, result, output_image, timestamp_ms):
+        face = landmarks_to_array(result.face_landmarks[0]) if result.face_landmarks else None
+        self._face_part = (timestamp_ms, face)
+        self._publish(timestamp_ms)
+        self._face_busy = False
+
+    def _publish(self, timestamp_ms):
+        """
+        两个模型都返回了同一帧的结果时，合成 PerceptionResult 放进最新结果槽位
+        """
+        hands_part, face_part, info = self._hands_part, self._face_part, self._frame_info
+        if hands_part is None or face_part is None or info is None:
+            return
+        if not hands_part[0] == face_part[0] == info[0] == timestamp_ms:
+            return
+        _, capture_time, width, height, measured = info
+        region = (0, 0, width, height)
+
+        # 测得的部位更新预测器，被跳过的部位按恒速外推，和 HandAndHeadControl 一致
+        if measured['left']:
+            hand_landmarks = {side: to_frame_coords(points.copy(), region) if points is not None else None
+                              for side, points in hands_part[1].items()}
+            for side in ('left', 'right'):
+                self._predictors[side].update(hand_landmarks[side], capture_time)
+        else:
+            hand_landmarks = {side: self._predictors[side].predict(capture_time) for side in ('left', 'right')}
+        hands = {side: landmarks_center(points) if points is not None else None
+                 for side, points in hand_landmarks.items()}
+
+        if measured['head']:
+            face_landmarks = to_frame_coords(face_part[1].copy(), region) if face_part[1] is not None else None
+            self._predictors['head'].update(face_landmarks, capture_time)
+        else:
+            face_landmarks = self._predictors['head'].predict(capture_time)
+        head = landmarks_center(face_landmarks) if face_landmarks is not None else None
+
+        result = PerceptionResult(hands, head, capture_time, time.perf_counter(), hand_landmarks, face_landmarks,
+                                  measured=measured)
+        self._latest = (timestamp_ms, result)
+
+    def poll(self):
+        """
+        取回最新的识别结果，不阻塞
+        :return: 自上次 poll 以来最新的 PerceptionResult，没有新结果时返回 None
+        """
+        latest = self._latest
+        if latest is None or latest[0] == self._polled_timestamp_ms:
+            return None
+        self._polled_timestamp_ms = latest[0]
+        return latest[1]
+
+    def close(self):
+        self.hand_landmarker.close()
+        self.face_landmarker.close()
+
+    # 与 PerceptionWorker 保持一致的名字
+    stop = close
@@ -0,0 +1,229 @@
+# benchmark.py
+"""
+无窗口、无摄像头的性能测试：用 SDL 的 dummy 显示驱动跑火柴人的模拟和渲染循环，
+按阶段（输入、update、check_hit、draw、HUD、flip）统计每帧耗时的分位数，结果可以写成 JSON 在提交之间对比。
+
+用法：
+    python benchmark.py --frames 2000 --fighters 2 --json before.json
+    python benchmark.py --frames 2000 --fighters 64 --world --no-render
+"""
+import argparse
+import json
+import os
+import platform
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+import stickman
+from stickman import StickMan
+from fighter_world import FighterWorld
+from hud import HUD
+from dirty_renderer import DirtyRectRenderer
+
+WIDTH, HEIGHT = 1200, 800
+GROUND_Y = 550
+COLORS = [(255, 0, 0), (0, 0, 255), (0, 160, 0), (200, 120, 0)]
+PHASES = ('input', 'update', 'check_hit', 'draw', 'hud', 'flip')
+PERCENTILES = (50, 90, 99)
+
+
+def random_inputs(rng, count):
+    """
+    每个火柴人这一帧的输入：(横向移动, 动作)，动作为 None、'jump'、'attack_left'、'attack_right'、'defend'
+    """
+    moves = rng.uniform(-5, 5, count)
+    rolls = rng.random(count)
+    actions = np.full(count, None, dtype=object)
+    actions[rolls < 0.04] = 'jump'
+    actions[(rolls >= 0.04) & (rolls < 0.08)] = 'attack_left'
+    actions[(rolls >= 0.08) & (rolls < 0.12)] = 'attack_right'
+    actions[(rolls >= 0.12) & (rolls < 0.14)] = 'defend'
+    return moves, actions
+
+
+# 固定的动作循环：每 120 帧一轮，每个火柴人错开几帧
+SCRIPT = {0: 'attack_right', 25: 'jump', 50: 'attack_left', 80: 'defend'}
+
+
+def scripted_inputs(frame, count):
+    moves = np.where((frame // 60) % 2 == 0, 3.0, -3.0) * np.ones(count)
+    actions = np.array([SCRIPT.get((frame + 7 * i) % 120) for i in range(count)], dtype=object)
+    return moves, actions
+
+
+def apply_inputs(fighters, moves, actions):
+    for fighter, move, action in zip(fighters, moves, actions):
+        fighter.x = max(50, min(WIDTH - 50, fighter.x + move))
+        fighter.is_moving = abs(move) > 1
+        if action is not None:
+            getattr(fighter, action)()
+
+
+def summarize(samples):
+    """
+    :param samples: 每帧耗时（秒）
+    :return: 毫秒为单位的 mean、各分位数和 max
+    """
+    ms = np.asarray(samples) * 1000.0
+    if len(ms) == 0:
+        return None
+    summary = {'mean': float(ms.mean())}
+    for q, value in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+        summary[f'p{q}'] = float(value)
+    summary['max'] = float(ms.max())
+    return summary
+
+
+def run(frames=1000, fighters=2, seed=0, inputs='random', use_world=False, render=True, render_mode='dirty',
+        sprite_cache=False, warmup=50):
+    """
+    :return: 结果字典：配置、每个阶段的耗时统计、精灵缓存命中情况、最后的血量
+    """
+    rng = np.random.default_rng(seed)
+    # 调用方已经初始化过 pygame 时沿用它的显示，测完也不退出
+    owns_pygame = not pygame.display.get_init()
+    if owns_pygame:
+        pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    # 精灵缓存是类属性，测完要恢复，不影响调用方
+    shared_cache = StickMan.sprite_cache
+    StickMan.sprite_cache = stickman.SpriteCache() if sprite_cache else None
+    try:
+        positions = np.linspace(100, WIDTH - 100, fighters)
+        if use_world:
+            world = FighterWorld(capacity=fighters, ground_y=GROUND_Y)
+            players = [world.spawn(x, GROUND_Y, COLORS[i % len(COLORS)], flip=i % 2 == 1)
+                       for i, x in enumerate(positions)]
+        else:
+            world = None
+            players = [StickMan(x, GROUND_Y, COLORS[i % len(COLORS)], flip=i % 2 == 1) for i, x in enumerate(positions)]
+        # 对象模式下每个火柴人打相邻的下一个，两人时就是一对一
+        opponents = [players[(i + 1) % fighters] for i in range(fighters)]
+
+        hud = HUD(WIDTH, HEIGHT, GROUND_Y, (COLORS[0], COLORS[1]))
+        renderer = DirtyRectRenderer(screen, hud.background, full_redraw=render_mode == 'full')
+
+        timings = {phase: [] for phase in PHASES}
+        clock = time.perf_counter
+        for frame in range(warmup + frames):
+            record = frame >= warmup
+            t0 = clock()
+            if inputs == 'script':
+                moves, actions = scripted_inputs(frame, fighters)
+            else:
+                moves, actions = random_inputs(rng, fighters)
+            apply_inputs(players, moves, actions)
+            t1 = clock()
+
+            if world is not None:
+                world.step()
+            else:
+                for player, other in zip(players, opponents):
+                    player.update(other)
+            t2 = clock()
+
+            if world is not None:
+                world.apply_hits(world.find_hits())
+            else:
+                for player, other in zip(players, opponents):
+                    player.check_hit(other)
+            t3 = clock()
+
+            if render:
+                renderer.begin()
+                for player in players:
+                    renderer.add(player.draw(screen))
+                t4 = clock()
+                for rect in hud.draw_health_bars(screen, players[0].health, players[-1].health):
+                    renderer.add(rect)
+                t5 = clock()
+                renderer.present()
+                t6 = clock()
+            else:
+                t4 = t5 = t6 = t3
+
+            if record:
+                for phase, start, end in zip(PHASES, (t0, t1, t2, t3, t4, t5), (t1, t2, t3, t4, t5, t6)):
+                    timings[phase].append(end - start)
+            # 血量打光后复活，保证整段测试里都有出拳和命中
+            for player in players:
+                if player.health <= 0:
+                    player.health = 100
+
+        cache = StickMan.sprite_cache
+        total = np.sum([timings[phase] for phase in PHASES], axis=0)
+        phases = PHASES if render else PHASES[:3]
+        result = {
+            'config': {'frames': frames, 'fighters': fighters, 'seed': seed, 'inputs': inputs, 'world': use_world,
+                       'render': render, 'render_mode': render_mode, 'sprite_cache': sprite_cache,
+                       'warmup': warmup},
+            'environment': {'python': platform.python_version(), 'pygame': pygame.version.ver,
+                            'numpy': np.__version__, 'machine': platform.machine()},
+            'phases': {phase: summarize(timings[phase]) for phase in phases},
+            'frame': summarize(total),
+            'sprite_cache': ({'hits': cache.hits, 'misses': cache.misses, 'evictions': cache.evictions,
+                              'hit_rate': cache.hit_rate} if cache is not None and render else None),
+            'health': [float(player.health) for player in players],
+        }
+    finally:
+        StickMan.sprite_cache = shared_cache
+        if owns_pygame:
+            pygame.quit()
+    return result
+
+
+def print_result(result):
+    config = result['config']
+    print(f"{config['fighters']} 个火柴人，{config['frames']} 帧，"
+          f"{'FighterWorld' if config['world'] else 'StickMan'}，"
+          f"{'渲染: ' + config['render_mode'] if config['render'] else '不渲染'}")
+    print("phase        mean      p50      p90      p99      max   (ms)")
+    for name, stats in list(result['phases'].items()) + [('frame', result['frame'])]:
+        if stats is None:
+            print(f"{name:<10} n/a")
+            continue
+        print(f"{name:<10} {stats['mean']:7.3f}  {stats['p50']:7.3f}  {stats['p90']:7.3f}  "
+              f"{stats['p99']:7.3f}  {stats['max']:7.3f}")
+    if result['sprite_cache']:
+        cache = result['sprite_cache']
+        print(f"精灵缓存命中率 {cache['hit_rate']:.1%}（{cache['hits']} 命中 / {cache['misses']} 未命中，"
+              f"{cache['evictions']} 次淘汰）")
+
+
+def _positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"必须是正整数: {text}")
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="无窗口的火柴人模拟和渲染性能测试")
+    parser.add_argument('--frames', type=_positive_int, default=1000)
+    parser.add_argument('--fighters', type=_positive_int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--inputs', choices=('random', 'script'), default='random', help="随机输入或固定的动作循环")
+    parser.add_argument('--world', action='store_true', help="用 FighterWorld 的向量化模拟代替逐个 StickMan")
+    parser.add_argument('--no-render', action='store_true', help="只测模拟，不画也不提交画面")
+    parser.add_argument('--render-mode', choices=('dirty', 'full'), default='dirty')
+    parser.add_argument('--sprite-cache', action='store_true', help="用精灵缓存画火柴人，默认每帧直接用 pygame.draw 画")
+    parser.add_argument('--warmup', type=int, default=50, help="不计入统计的预热帧数")
+    parser.add_argument('--json', default=None, help="把结果写进 JSON 文件")
+    args = parser.parse_args()
+
+    result = run(frames=args.frames, fighters=args.fighters, seed=args.seed, inputs=args.inputs,
+                 use_world=args.world, render=not args.no_render, render_mode=args.render_mode,
+                 sprite_cache=args.sprite_cache, warmup=args.warmup)
+    print_result(result)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# camera_preview.py
+import time
+
+import cv2
+import numpy as np
+import pygame
+
+
+class CameraPreview:
+    """
+    游戏画面里的摄像头小窗口。
+    先把整帧缩小到预览尺寸再转 RGB，结果写进一块复用的缓冲区；Surface 用 frombuffer 和这块缓冲区
+    共享内存，所以更新画面不需要旋转、翻转，也不会每帧新建 Surface。
+    预览不需要和游戏一样的帧率，按 fps 限制更新频率，不到时间的帧直接沿用上一张。
+    """
+
+    def __init__(self, size=(200, 150), fps=15):
+        """
+        :param size: 预览窗口大小 (宽, 高)
+        :param fps: 预览的最高更新频率，None 或 0 表示每帧都更新
+        """
+        self.size = size
+        self.interval = 1.0 / fps if fps else 0.0
+        width, height = size
+        self._small = np.empty((height, width, 3), dtype=np.uint8)
+        self._rgb = np.zeros((height, width, 3), dtype=np.uint8)
+        self.surface = pygame.image.frombuffer(self._rgb, size, 'RGB')
+        self._last_update = None
+
+    def update(self, frame, now=None):
+        """
+        :param frame: BGR 图像帧
+        :return: 这次是否真的更新了画面
+        """
+        if now is None:
+            now = time.perf_counter()
+        if self._last_update is not None and now - self._last_update < self.interval:
+            return False
+        self._last_update = now
+        cv2.resize(frame, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        return True
+
+    def draw(self, screen, pos):
+        """
+        :return: 画过的区域（pygame.Rect）
+        """
+        return screen.blit(self.surface, pos)
@@ -0,0 +1,98 @@
+# camera_stream.py
+import threading
+import time
+
+import cv2
+
+
+class ThreadedCapture:
+    """
+    后台线程持续读取摄像头，只保留最新的一帧及其采集时间戳。
+    游戏循环调用 read() 时不会等待摄像头 I/O，也不会读到驱动队列里积压的旧帧。
+    """
+
+    def __init__(self, source=0):
+        self.cap = cv2.VideoCapture(source)
+
+        self._cond = threading.Condition()
+        self._frame = None
+        self._capture_time = None
+        self._seq = 0        # 已采集的帧数
+        self._read_seq = 0   # 上一次 read() 返回的帧序号
+
+        self._running = False
+        self._thread = None
+
+    def start(self, first_frame_timeout=2.0):
+        """
+        启动采集线程，并等待第一帧到达（摄像头预热），返回自身以便链式调用
+        :param first_frame_timeout: 等待第一帧的最长秒数
+        """
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        with self._cond:
+            self._cond.wait_for(lambda: self._frame is not None or not self._running, first_frame_timeout)
+        return self
+
+    def stop(self):
+        """
+        停止采集线程并释放摄像头
+        """
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.cap.release()
+
+    # 与 cv2.VideoCapture 保持一致的名字
+    release = stop
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def get(self, prop_id):
+        return self.cap.get(prop_id)
+
+    def is_opened(self):
+        return self.cap.isOpened()
+
+    def _loop(self):
+        while self._running:
+            ret, frame = self.cap.read()
+            capture_time = time.perf_counter()
+            if not ret:
+                if not self.cap.isOpened():
+                    break
+                time.sleep(0.005)
+                continue
+            with self._cond:
+                self._frame = frame
+                self._capture_time = capture_time
+                self._seq += 1
+                self._cond.notify_all()
+        self._running = False
+
+    def read(self, timeout=0.0):
+        """
+        读取最新的一帧
+        :param timeout: 没有新帧时最多等待的秒数，0 表示立即返回
+        :return: (ret, frame, capture_time, fresh)。fresh 表示这是上次 read() 之后的新帧；
+                 等待超时时返回上一帧且 fresh 为 False，调用方应跳过识别和轨迹记录，避免同一帧重复处理；
+                 还没有任何帧时返回 (False, None, None, False)
+        """
+        with self._cond:
+            if self._seq == self._read_seq and timeout > 0 and self._running:
+                self._cond.wait_for(lambda: self._seq != self._read_seq or not self._running, timeout)
+            if self._frame is None:
+                return False, None, None, False
+            fresh = self._seq != self._read_seq
+            self._read_seq = self._seq
+            return True, self._frame, self._capture_time, fresh
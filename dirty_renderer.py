@@ -0,0 +1,74 @@
+# dirty_renderer.py
+import pygame
+
+
+class DirtyRectRenderer:
+    """
+    脏矩形渲染：静态内容（背景色、地面等）预先画在 background 上，每帧只把上一帧画过东西的
+    区域从 background 恢复，再把这一帧画过的区域交给 pygame.display.update(rects)，
+    不再整屏 fill + flip。
+
+    每帧的用法：
+        renderer.begin()                  # 代替 screen.fill(...)
+        renderer.add(player.draw(screen)) # 每个动态元素画完后登记它的 Rect
+        renderer.present()                # 代替 pygame.display.flip()
+
+    full_redraw=True 时退回整屏重画（每帧整张贴背景 + flip），用来对比效果和开销
+    """
+
+    def __init__(self, screen, background, full_redraw=False):
+        self.screen = screen
+        self.background = background
+        self.full_redraw = full_redraw
+        self._previous = []   # 上一帧画过的区域，这一帧要先擦掉
+        self._current = []
+        self._invalid = True  # 下一帧整屏重画（第一帧、切换画面之后）
+        self.updated_pixels = 0  # 最近一次 present() 提交的像素数
+
+    def invalidate(self):
+        """
+        屏幕被其他代码整屏改写过（例如结算画面），下一帧整屏恢复
+        """
+        self._invalid = True
+
+    def begin(self):
+        self._current = []
+        if self.full_redraw or self._invalid:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self._previous:
+                self.screen.blit(self.background, rect, rect)
+
+    def add(self, rect):
+        """
+        登记这一帧画过的区域；pygame.draw.* 和 Surface.blit 的返回值可以直接传进来
+        """
+        if rect is not None and rect.width > 0 and rect.height > 0:
+            self._current.append(rect)
+
+    def present(self):
+        if self.full_redraw or self._invalid:
+            pygame.display.flip()
+            self.updated_pixels = self.screen.get_width() * self.screen.get_height()
+            self._invalid = False
+        else:
+            # 擦掉的旧区域和新画的区域都要提交，重叠的先合并，减少 update 的矩形数
+            rects = _merge(self._previous + self._current)
+            pygame.display.update(rects)
+            self.updated_pixels = sum(rect.width * rect.height for rect in rects)
+        self._previous = self._current
+
+
+def _merge(rects):
+    """
+    把互相重叠的矩形合并成它们的外接矩形
+    """
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
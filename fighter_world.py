@@ -0,0 +1,306 @@
+# fighter_world.py
+import numpy as np
+
+from stickman import StickMan
+
+# 每个火柴人的模拟状态，一个字段一列
+FIELDS = {
+    'x': np.float64,
+    'y': np.float64,
+    'attacking_left': np.bool_,
+    'attacking_right': np.bool_,
+    'attack_timer_left': np.int64,
+    'attack_timer_right': np.int64,
+    'attack_duration': np.int64,
+    'punch_scale_left': np.float64,
+    'punch_scale_right': np.float64,
+    'arm_length_left': np.float64,
+    'arm_length_right': np.float64,
+    'defending': np.bool_,
+    'defense_timer': np.int64,
+    'defense_duration': np.int64,
+    'head_scale': np.float64,
+    'health': np.float64,
+    'is_jumping': np.bool_,
+    'jump_velocity': np.float64,
+    'jump_height': np.float64,
+    'gravity': np.float64,
+    'jump_speed': np.float64,
+    'is_moving': np.bool_,
+    'facing_right': np.bool_,
+    'animation_frame': np.float64,
+    # 最近两个模拟步结束时的位置，渲染插值用
+    'prev_x': np.float64,
+    'prev_y': np.float64,
+    'cur_x': np.float64,
+    'cur_y': np.float64,
+}
+
+# find_hits() 返回的命中事件：出拳的人、被打中的人、哪只手（1 右、-1 左）、伤害、是否被防住
+HIT_EVENT = np.dtype([('attacker', np.intp), ('target', np.intp), ('side', np.int8), ('damage', np.float64),
+                      ('blocked', np.bool_)])
+
+
+class FighterWorld:
+    """
+    多人混战用的火柴人世界：所有火柴人的状态按列存成 NumPy 数组（struct-of-arrays），
+    step() 一次向量化地推进所有人的跳跃、出拳、防御计时，开销几乎不随人数增长。
+    spawn() 返回的 Fighter 是某一行的视图，可以像 StickMan 一样读写属性、draw()。
+    """
+
+    def __init__(self, capacity=8, ground_y=550, hit_radius=40, damage=10):
+        self.ground_y = ground_y
+        self.hit_radius = hit_radius
+        self.damage = damage
+        self.count = 0
+        self.capacity = capacity
+        for name, dtype in FIELDS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.fighters = []
+
+    def _grow(self):
+        self.capacity *= 2
+        for name in FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(self.capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def spawn(self, x, y, color, flip=False):
+        """
+        添加一个火柴人，初始状态和 StickMan(x, y, color, flip) 相同
+        :return: 这一行的 Fighter 视图
+        """
+        if self.count == self.capacity:
+            self._grow()
+        fighter = Fighter(self, self.count, x, y, color, flip)
+        self.count += 1
+        self.fighters.append(fighter)
+        return fighter
+
+    def nearest_targets(self):
+        """
+        每个火柴人横向距离最近的另一个火柴人的下标（只有一个人时是自己）
+        """
+        n = self.count
+        if n < 2:
+            return np.arange(n)
+        # 按横坐标排序后，最近的人一定是左右两个邻居之一，O(n log n)
+        order = np.argsort(self.x[:n], kind='stable')
+        gaps = np.diff(self.x[:n][order])
+        to_left = np.concatenate(([np.inf], gaps))
+        to_right = np.concatenate((gaps, [np.inf]))
+        position = np.arange(n)
+        neighbour = np.where(to_left <= to_right, position - 1, position + 1)
+        targets = np.empty(n, dtype=np.intp)
+        targets[order] = order[neighbour]
+        return targets
+
+    def step(self, targets=None):
+        """
+        所有火柴人前进一个模拟步，逐项对应 StickMan.update(other)
+        :param targets: 每个火柴人出拳时对着的对手下标，默认取 nearest_targets()
+        """
+        n = self.count
+        if n == 0:
+            return
+        if targets is None:
+            targets = self.nearest_targets()
+
+        self.animation_frame[:n] += 0.2
+
+        # 跳跃
+        y, jump_velocity, jumping = self.y[:n], self.jump_velocity[:n], self.is_jumping[:n]
+        y[jumping] -= jump_velocity[jumping]
+        jump_velocity[jumping] -= self.gravity[:n][jumping]
+        landed = jumping & (y >= self.ground_y)
+        y[landed] = self.ground_y
+        jumping[landed] = False
+        jump_velocity[landed] = 0
+
+        # 出拳：臂长伸到对手的距离（限制在 40 到 150），拳头先放大到 3 倍再缩回
+        x = self.x[:n]
+        reach = np.clip(np.abs(x[targets] - x), 40, 150)
+        duration = self.attack_duration[:n]
+        for side in ('left', 'right'):
+            self._step_attack(side, n, reach, duration)
+
+        # 防御：前半段头部放大到 3 倍，结束时恢复
+        defending = self.defending[:n]
+        timer = self.defense_timer[:n]
+        timer[defending] += 1
+        half = self.defense_duration[:n] / 2
+        growing = defending & (timer <= half)
+        self.head_scale[:n][growing] = 1.0 + (timer[growing] / half[growing]) * 2.0
+        done = defending & (timer >= self.defense_duration[:n])
+        defending[done] = False
+        timer[done] = 0
+        self.head_scale[:n][done] = 1.0
+
+        self.prev_x[:n] = self.cur_x[:n]
+        self.prev_y[:n] = self.cur_y[:n]
+        self.cur_x[:n] = x
+        self.cur_y[:n] = y
+
+    def _step_attack(self, side, n, reach, duration):
+        attacking = getattr(self, 'attacking_' + side)[:n]
+        timer = getattr(self, 'attack_timer_' + side)[:n]
+        punch_scale = getattr(self, 'punch_scale_' + side)[:n]
+        arm_length = getattr(self, 'arm_length_' + side)[:n]
+
+        timer[attacking] += 1
+        half = duration / 2
+        extending = attacking & (timer <= half)
+        retracting = attacking & ~extending
+        punch_scale[extending] = 1.0 + (timer[extending] / half[extending]) * 2.0
+        arm_length[extending] = reach[extending]
+        punch_scale[retracting] = 3.0 - ((timer[retracting] - half[retracting]) / half[retracting]) * 2.0
+        arm_length[retracting] = 40 + ((duration[retracting] - timer[retracting]) / half[retracting]) * (
+            reach[retracting] - 40)
+
+        done = attacking & (timer >= duration)
+        attacking[done] = False
+        timer[done] = 0
+        punch_scale[done] = 1.0
+        arm_length[done] = 40
+
+    def resolve_hits(self, targets=None):
+        """
+        所有火柴人的命中判定，逐项对应 StickMan.check_hit(other)：出拳到一半时拳头离对手头部不到
+        hit_radius 就造成伤害（对手在防御时不掉血）
+        :return: 每个火柴人这一步是否打中了对手（bool 数组）
+        """
+        n = self.count
+        if targets is None:
+            targets = self.nearest_targets()
+        x, y = self.x[:n], self.y[:n]
+        arm_joint_y = y + 15 * self.head_scale[:n] + 15
+        strike = self.attack_duration[:n] // 2
+        target_x, target_y = x[targets], y[targets]
+
+        hits = np.zeros(n, dtype=bool)
+        damage = np.zeros(n)
+        for side, sign in (('right', 1), ('left', -1)):
+            punching = getattr(self, 'attacking_' + side)[:n] & (getattr(self, 'attack_timer_' + side)[:n] == strike)
+            punch_x = x + sign * getattr(self, 'arm_length_' + side)[:n]
+            hit = punching & (np.hypot(punch_x - target_x, arm_joint_y - target_y) < self.hit_radius)
+            hits |= hit
+            np.add.at(damage, targets[hit], self.damage)
+
+        health = self.health[:n]
+        damage[self.defending[:n]] = 0
+        np.maximum(health - damage, 0, out=health)
+        return hits
+
+    def _punches(self):
+        """
+        这一步正好出拳到一半（命中判定帧）的所有拳头
+        :return: (出拳的人, 哪只手, 拳头 x, 拳头 y)
+        """
+        n = self.count
+        x = self.x[:n]
+        arm_joint_y = self.y[:n] + 15 * self.head_scale[:n] + 15
+        strike = self.attack_duration[:n] // 2
+        attackers, sides, punch_x, punch_y = [], [], [], []
+        for side, sign in (('right', 1), ('left', -1)):
+            index = np.flatnonzero(getattr(self, 'attacking_' + side)[:n]
+                                   & (getattr(self, 'attack_timer_' + side)[:n] == strike))
+            attackers.append(index)
+            sides.append(np.full(len(index), sign, dtype=np.int8))
+            punch_x.append(x[index] + sign * getattr(self, 'arm_length_' + side)[:n][index])
+            punch_y.append(arm_joint_y[index])
+        return (np.concatenate(attackers), np.concatenate(sides), np.concatenate(punch_x),
+                np.concatenate(punch_y))
+
+    def find_hits(self):
+        """
+        多人混战的命中判定：拳头可以打中身边任何一个人，不只是指定的对手。
+        先把所有人按横坐标分进宽 hit_radius 的格子（场地是一条横向的地面，一维网格就够了），
+        每个拳头只和它所在格子及左右相邻格子里的人比较距离，候选对一次性向量化检查。
+        只报告命中事件，不修改血量，交给 apply_hits() 统一结算
+        :return: HIT_EVENT 结构化数组
+        """
+        n = self.count
+        attackers, sides, punch_x, punch_y = self._punches()
+        if n < 2 or len(attackers) == 0:
+            return np.zeros(0, dtype=HIT_EVENT)
+
+        x, y = self.x[:n], self.y[:n]
+        cell_size = self.hit_radius
+        cells = np.floor(x / cell_size).astype(np.int64)
+        order = np.argsort(cells, kind='stable')
+        sorted_cells = cells[order]
+
+        # 每个拳头的候选范围：排好序的格子里 [格子 - 1, 格子 + 1] 这一段
+        punch_cells = np.floor(punch_x / cell_size).astype(np.int64)
+        lo = np.searchsorted(sorted_cells, punch_cells - 1, side='left')
+        hi = np.searchsorted(sorted_cells, punch_cells + 1, side='right')
+        counts = hi - lo
+        punch = np.repeat(np.arange(len(attackers)), counts)
+        offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        candidate = order[np.repeat(lo, counts) + offset]
+
+        hit = (candidate != attackers[punch]) & (
+            np.hypot(punch_x[punch] - x[candidate], punch_y[punch] - y[candidate]) < self.hit_radius)
+        punch, candidate = punch[hit], candidate[hit]
+
+        events = np.zeros(len(punch), dtype=HIT_EVENT)
+        events['attacker'] = attackers[punch]
+        events['target'] = candidate
+        events['side'] = sides[punch]
+        events['damage'] = self.damage
+        events['blocked'] = self.defending[:n][candidate]
+        return events
+
+    def apply_hits(self, events):
+        """
+        按 find_hits() 的事件统一扣血，被防住的不扣
+        """
+        n = self.count
+        damage = np.zeros(n)
+        landed = events[~events['blocked']]
+        np.add.at(damage, landed['target'], landed['damage'])
+        health = self.health[:n]
+        np.maximum(health - damage, 0, out=health)
+
+
+def _row_property(name):
+    def fget(self):
+        return getattr(self.world, name)[self.index].item()
+
+    def fset(self, value):
+        getattr(self.world, name)[self.index] = value
+
+    return property(fget, fset)
+
+
+class Fighter(StickMan):
+    """
+    FighterWorld 里一行的视图：属性读写都落在世界的数组上，draw() 等方法和 StickMan 完全一样
+    """
+
+    def __init__(self, world, index, x, y, color, flip=False):
+        self.world = world
+        self.index = index
+        super().__init__(x, y, color, flip)
+
+    @property
+    def _prev_position(self):
+        return self.world.prev_x[self.index].item(), self.world.prev_y[self.index].item()
+
+    @_prev_position.setter
+    def _prev_position(self, value):
+        self.world.prev_x[self.index], self.world.prev_y[self.index] = value
+
+    @property
+    def _position(self):
+        return self.world.cur_x[self.index].item(), self.world.cur_y[self.index].item()
+
+    @_position.setter
+    def _position(self, value):
+        self.world.cur_x[self.index], self.world.cur_y[self.index] = value
+
+
+for _name in FIELDS:
+    if _name not in ('prev_x', 'prev_y', 'cur_x', 'cur_y'):
+        setattr(Fighter, _name, _row_property(_name))
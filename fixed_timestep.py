@@ -0,0 +1,92 @@
+# fixed_timestep.py
+import time
+
+
+class FixedTimestep:
+    """
+    固定步长的模拟时钟：渲染循环每帧调用 advance()，按实际经过的时间累积，返回这一帧要跑几个模拟步。
+    StickMan 的计时器、重力、动画都按“步”计数，步长固定后动作快慢就和渲染帧率、识别卡顿无关，
+    同样的输入序列总是得到同样的结果（可以用来回放）。
+    渲染时用 alpha（上一步到下一步之间的比例）在两个模拟状态之间插值。
+    """
+
+    def __init__(self, step=1 / 30, max_steps=5):
+        """
+        :param step: 每个模拟步的时长（秒）
+        :param max_steps: 一帧最多补跑的步数，卡顿太久时丢掉多出的时间，避免越补越慢
+        """
+        self.step = step
+        self.max_steps = max_steps
+        self.ticks = 0  # 已经跑过的模拟步数
+        self._accumulator = 0.0
+        self._last = None
+
+    def reset(self):
+        """
+        重新开始计时（例如暂停或结算画面之后），不补跑中间的时间
+        """
+        self._accumulator = 0.0
+        self._last = None
+
+    def advance(self, now=None):
+        """
+        :param now: 当前时间（time.perf_counter 秒）
+        :return: 这一帧要跑的模拟步数
+        """
+        if now is None:
+            now = time.perf_counter()
+        if self._last is None:
+            self._last = now
+            return 0
+        self._accumulator += now - self._last
+        self._last = now
+
+        steps = int(self._accumulator // self.step)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self._accumulator = self._accumulator % self.step
+        else:
+            self._accumulator -= steps * self.step
+        self.ticks += steps
+        return steps
+
+    @property
+    def alpha(self):
+        """
+        当前时刻在上一步和下一步之间的位置，范围 [0, 1)
+        """
+        return self._accumulator / self.step
+
+
+class InputLatch:
+    """
+    把每帧采到的输入锁存到模拟步上。
+    触发型的输入（跳跃、出拳、防御的位掩码）在帧之间累积，由下一个模拟步 pop() 取走，只生效一次；
+    一帧跑了 0 步时留给下一帧，跑了多步时只有第一步拿到。持续型的输入（移动、按住的键）放在 held，
+    这一帧的每个模拟步都用它。这样每个输入都落在确定的某一步上，模拟结果只取决于每一步的输入序列，
+    和一帧跑几步无关，录下每一步的输入就能回放。
+    """
+
+    def __init__(self):
+        self.held = 0
+        self._pending = 0
+
+    def push(self, mask, held=None):
+        """
+        :param mask: 这一帧的触发型输入（位掩码），和还没被取走的输入合并
+        :param held: 这一帧的持续型输入，None 表示和 mask 相同
+        """
+        self._pending |= mask
+        self.held = mask if held is None else held
+
+    def pop(self):
+        """
+        一个模拟步调用一次：取走累积的触发型输入
+        """
+        mask = self._pending
+        self._pending = 0
+        return mask
+
+    def clear(self):
+        self.held = 0
+        self._pending = 0
@@ -0,0 +1,207 @@
+# gesture_tuning.py
+"""
+离线调阈值：读取录下来的头部和手部轨迹，对整段录像一次性算出每一帧时间窗口内的平均速度，
+在速度阈值 × 窗口时长的网格上批量评估，输出每个参数组合的 precision、recall 和检测延迟。
+和游戏里的判断一样按采集时间戳计算，调出来的参数不受录制时帧率的影响。
+
+用法：
+    python gesture_tuning.py player1.npz player1.labels.json --gesture jump \\
+        --windows 0.3:1.51:0.1 --thresholds -120:-10:2 --top 10
+
+标注文件是 JSON 列表，时间是相对录像开始的秒数：
+    [{"gesture": "jump", "start": 3.2, "end": 3.9}, ...]
+"""
+import argparse
+import json
+
+import numpy as np
+
+from movement_analyzer import JUMP_SPEED, MOVE_SPEED, ATTACK_SPEED, HEAD_WINDOW, HAND_WINDOW
+
+# 每种动作：(用哪条轨迹, 哪个坐标, 比较方向, 游戏里的默认阈值, 游戏里的窗口时长)
+# 方向为 -1 表示速度小于阈值算触发，+1 表示大于阈值算触发
+GESTURES = {
+    'jump': ('head', 1, -1, JUMP_SPEED, HEAD_WINDOW),
+    'move_left': ('head', 0, -1, -MOVE_SPEED, HEAD_WINDOW),
+    'move_right': ('head', 0, 1, MOVE_SPEED, HEAD_WINDOW),
+    'attack_left': ('left', 0, -1, -ATTACK_SPEED, HAND_WINDOW),
+    'attack_right': ('right', 0, 1, ATTACK_SPEED, HAND_WINDOW),
+}
+
+
+class TrajectoryRecorder:
+    """
+    在游戏里逐帧记录一个玩家的轨迹，没检测到的部位记为 NaN
+    """
+
+    def __init__(self):
+        self.times = []
+        self.head = []
+        self.left = []
+        self.right = []
+
+    def add(self, t, head, left, right):
+        nan = (np.nan, np.nan)
+        self.times.append(t)
+        self.head.append(head if head is not None else nan)
+        self.left.append(left if left is not None else nan)
+        self.right.append(right if right is not None else nan)
+
+    def save(self, path):
+        np.savez_compressed(path, t=np.asarray(self.times, dtype=np.float64),
+                            head=np.asarray(self.head, dtype=np.float64),
+                            left=np.asarray(self.left, dtype=np.float64),
+                            right=np.asarray(self.right, dtype=np.float64))
+
+
+def _forward_fill(points):
+    """
+    没检测到的帧沿用上一个有效点（和 TrackSequence 的规则一致）
+    """
+    valid = ~np.isnan(points[:, 0])
+    index = np.where(valid, np.arange(len(points)), 0)
+    np.maximum.accumulate(index, out=index)
+    return points[index]
+
+
+def load_recording(path):
+    """
+    :return: {'t': 相对录像开始的秒数, 'head'/'left'/'right': (N, 2) 已补齐的轨迹}
+    """
+    data = np.load(path)
+    t = data['t'] - data['t'][0]
+    return {'t': t, 'head': _forward_fill(data['head']), 'left': _forward_fill(data['left']),
+            'right': _forward_fill(data['right'])}
+
+
+def load_labels(path, gesture):
+    """
+    :return: 该动作的标注区间 [(start, end), ...]，单位秒
+    """
+    with open(path, encoding='utf-8') as f:
+        labels = json.load(f)
+    return [(item['start'], item['end']) for item in labels if item['gesture'] == gesture]
+
+
+def window_speeds(t, values, window):
+    """
+    每一帧（以它结尾、长 window 秒的窗口）首尾的平均速度，和 TrackSequence.velocity() 的算法一致；
+    录像开头还没覆盖满一个窗口的帧记为 NaN
+    """
+    start = np.searchsorted(t, t - window)
+    elapsed = t - t[start]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        speed = (values - values[start]) / elapsed
+    speed[(elapsed <= 0) | (t - t[0] < window)] = np.nan
+    return speed
+
+
+def evaluate(recording, segments, gesture, thresholds, windows, tolerance=0.2):
+    """
+    在速度阈值（像素/秒）× 窗口时长（秒）网格上评估一种动作
+    :param segments: 标注区间 [(start, end), ...]
+    :param tolerance: 区间结束后多少秒内的触发仍算命中
+    :return: 结构化数组，每行一个参数组合：window, threshold, precision, recall, f1, latency, events
+    """
+    track, col, direction = GESTURES[gesture][:3]
+    t = recording['t']
+    values = recording[track][:, col]
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+
+    # 每个标注区间对应的帧范围（允许的延迟算在区间内）
+    bounds = []
+    for start, end in segments:
+        lo, hi = np.searchsorted(t, [start, end + tolerance])
+        if hi <= lo:
+            continue
+        bounds.append((lo, hi, start))
+
+    rows = []
+    for window in windows:
+        speed = window_speeds(t, values, window)
+        # (阈值数, 帧数) 的触发矩阵，NaN 比较结果为 False
+        if direction < 0:
+            fired = speed[None, :] < thresholds[:, None]
+        else:
+            fired = speed[None, :] > thresholds[:, None]
+        # 只统计从不触发到触发的那一帧，连续触发算一次动作
+        events = fired.copy()
+        events[:, 1:] &= ~fired[:, :-1]
+
+        total_events = events.sum(axis=1)
+
+        detected = np.zeros(len(thresholds))
+        latency_sum = np.zeros(len(thresholds))
+        for lo, hi, start in bounds:
+            segment_events = events[:, lo:hi]
+            hit = segment_events.any(axis=1)
+            first = lo + segment_events.argmax(axis=1)
+            detected += hit
+            latency_sum += np.where(hit, t[first] - start, 0.0)
+
+        # 每个区间最多算一次命中，同一区间里反复触发的多余事件算误触发（游戏里会变成连续出拳）
+        matched_events = np.minimum(detected, total_events)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            precision = np.where(total_events > 0, matched_events / total_events, 0.0)
+            recall = detected / len(segments) if segments else np.zeros(len(thresholds))
+            f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+            latency = np.where(detected > 0, latency_sum / detected, np.nan)
+
+        for k, threshold in enumerate(thresholds):
+            rows.append((window, threshold, precision[k], recall[k], f1[k], latency[k], total_events[k]))
+
+    dtype = [('window', 'f8'), ('threshold', 'f8'), ('precision', 'f8'), ('recall', 'f8'), ('f1', 'f8'),
+             ('latency', 'f8'), ('events', 'i4')]
+    return np.array(rows, dtype=dtype)
+
+
+def _parse_range(text):
+    """
+    'start:stop:step' 转成 np.arange，单个数字表示只有一个值
+    """
+    parts = [float(v) for v in text.split(':')]
+    if len(parts) == 1:
+        return np.array(parts)
+    return np.arange(*parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线评估动作判断阈值")
+    parser.add_argument('recording', help="TrajectoryRecorder 保存的 .npz 轨迹")
+    parser.add_argument('labels', help="标注 JSON 文件")
+    parser.add_argument('--gesture', choices=sorted(GESTURES), default='jump')
+    parser.add_argument('--windows', default=None, help="窗口时长（秒），start:stop:step")
+    parser.add_argument('--thresholds', default=None, help="速度阈值（像素/秒），start:stop:step")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="区间结束后仍算命中的秒数")
+    parser.add_argument('--top', type=int, default=10, help="按 F1 输出前几名")
+    parser.add_argument('--json', default=None, help="把全部结果写进 JSON 文件")
+    args = parser.parse_args()
+
+    recording = load_recording(args.recording)
+    segments = load_labels(args.labels, args.gesture)
+    default_threshold, default_window = GESTURES[args.gesture][3:]
+    if args.thresholds is None:
+        thresholds = np.linspace(default_threshold * 0.2, default_threshold * 3, 200)
+    else:
+        thresholds = _parse_range(args.thresholds)
+    if args.windows is None:
+        windows = np.linspace(default_window * 0.25, default_window * 2, 36)
+    else:
+        windows = _parse_range(args.windows)
+
+    results = evaluate(recording, segments, args.gesture, thresholds, windows, args.tolerance)
+    print(f"{args.gesture}: {len(segments)} 个标注区间，{len(results)} 个参数组合")
+
+    order = np.argsort(-results['f1'], kind='stable')[:args.top]
+    print("window(s)  threshold(px/s)  precision  recall    f1   latency(s)  events")
+    for row in results[order]:
+        print(f"{row['window']:9.2f}  {row['threshold']:15.1f}  {row['precision']:9.2f}  {row['recall']:6.2f}  "
+              f"{row['f1']:5.2f}  {row['latency']:10.3f}  {row['events']:6d}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump([{name: row[name].item() for name in results.dtype.names} for row in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,300 @@
+import time
+
 import cv2
-import mediapipe as mp
 import math
+import numpy as np
+
+from perception_backends import create_backend
+
+
+def to_frame_coords(points, region):
+    """
+    把后端返回的归一化关键点映射到原始帧的像素坐标（原地修改）
+    :param points: (N, 3) 归一化关键点数组
+    :param region: 送进模型的图像在原始帧中的区域 (x0, y0, x1, y1)
+    :return: 每行 (x, y, z)，x、y 为原始帧的像素坐标，z 保持 MediaPipe 的归一化深度
+    """
+    x0, y0, x1, y1 = region
+    points[:, 0] = x0 + points[:, 0] * (x1 - x0)
+    points[:, 1] = y0 + points[:, 1] * (y1 - y0)
+    return points
+
+
+def landmarks_center(points):
+    """
+    关键点的平均坐标 (x, y)
+    """
+    x, y = points[:, :2].mean(axis=0)
+    return int(x), int(y)
+
+
+def landmarks_bbox(points):
+    """
+    关键点的外接矩形 (x_min, y_min, x_max, y_max)
+    """
+    x_min, y_min = points[:, :2].min(axis=0)
+    x_max, y_max = points[:, :2].max(axis=0)
+    return int(x_min), int(y_min), int(x_max), int(y_max)
+
+
+class PerceptionResult:
+    """
+    一次 process() 的识别结果
+    hands: {'left': (x, y) 或 None, 'right': (x, y) 或 None}
+    head: 头部中心坐标 (x, y) 或 None
+    capture_time: 帧的采集时间戳（time.perf_counter 秒）
+    process_time: 识别完成时的时间戳（time.perf_counter 秒）
+    hand_landmarks: {'left': (N, 3) 数组或 None, 'right': ...}，像素坐标；点数取决于识别后端
+                    （Hands 为 21 个点，Pose 只有手腕和三个指尖 4 个点）
+    face_landmarks: 面部关键点 (N, 3) 数组或 None，像素坐标；点数取决于识别后端（FaceMesh 为 468 个点）
+    roi: 本帧送进模型的区域 (x0, y0, x1, y1)，整帧识别时为 None
+    measured: {'head': bool, 'left': bool, 'right': bool}，True 表示本帧模型实际测得，
+              False 表示该模型本帧被跳过、数值是预测出来的
+    """
+    __slots__ = ('hands', 'head', 'capture_time', 'process_time', 'hand_landmarks', 'face_landmarks', 'roi',
+                 'measured')
+
+    def __init__(self, hands, head, capture_time, process_time, hand_landmarks=None, face_landmarks=None,
+                 roi=None, measured=None):
+        self.hands = hands
+        self.head = head
+        self.capture_time = capture_time
+        self.process_time = process_time
+        self.hand_landmarks = hand_landmarks if hand_landmarks is not None else {'left': None, 'right': None}
+        self.face_landmarks = face_landmarks
+        self.roi = roi
+        self.measured = measured if measured is not None else {'head': True, 'left': True, 'right': True}
+
+    @property
+    def latency(self):
+        """从采集到识别完成所用的时间（秒）"""
+        return self.process_time - self.capture_time
+
+    @property
+    def head_box(self):
+        """面部关键点的外接矩形，没有检测到时为 None"""
+        if self.face_landmarks is None:
+            return None
+        return landmarks_bbox(self.face_landmarks)
+
+    def hand_box(self, side):
+        """
+        某只手关键点的外接矩形
+        :param side: 'left' 或 'right'
+        """
+        points = self.hand_landmarks[side]
+        if points is None:
+            return None
+        return landmarks_bbox(points)
+
+
+class ConstantVelocityPredictor:
+    """
+    恒速模型：记住最近一次测得的关键点和速度，在模型被跳过的帧上外推位置
+    """
+
+    def __init__(self, max_age=0.5, smoothing=0.5):
+        """
+        :param max_age: 距离上次测量超过这个秒数就不再预测
+        :param smoothing: 速度的平滑系数，越大越相信最新一次的速度
+        """
+        self.max_age = max_age
+        self.smoothing = smoothing
+        self.reset()
+
+    def reset(self):
+        self._points = None
+        self._center = None
+        self._time = None
+        self._velocity = np.zeros(2, dtype=np.float32)
+
+    def update(self, points, t):
+        """
+        记录一次测量
+        :param points: (N, 3) 关键点数组，None 表示模型运行了但没有检测到
+        :param t: 采集时间戳
+        """
+        if points is None:
+            self.reset()
+            return
+        center = points[:, :2].mean(axis=0)
+        if self._center is not None and t > self._time:
+            velocity = (center - self._center) / (t - self._time)
+            self._velocity = self.smoothing * velocity + (1 - self.smoothing) * self._velocity
+        self._points = points
+        self._center = center
+        self._time = t
+
+    def predict(self, t):
+        """
+        外推 t 时刻的关键点
+        :return: 平移后的 (N, 3) 关键点数组，无法预测时返回 None
+        """
+        if self._points is None or t - self._time > self.max_age:
+            return None
+        points = self._points.copy()
+        points[:, :2] += self._velocity * (t - self._time)
+        return points
+
+
+class DetectionScheduler:
+    """
+    按各自的间隔决定每一帧运行哪些模型；间隔相同的模型自动错开相位，避免挤在同一帧
+    """
+
+    def __init__(self, intervals):
+        """
+        :param intervals: {模型名: 每隔多少帧运行一次}，1 表示每帧都运行
+        """
+        self.intervals = dict(intervals)
+        self._phases = {name: i % max(1, interval) for i, (name, interval) in enumerate(self.intervals.items())}
+        self.frame_index = 0
+
+    def tick(self):
+        """
+        推进一帧
+        :return: 本帧需要运行的模型名集合
+        """
+        first = self.frame_index == 0
+        due = {name for name, interval in self.intervals.items()
+               if first or interval <= 1 or self.frame_index % interval == self._phases[name]}
+        self.frame_index += 1
+        return due
+
+    def reset(self):
+        self.frame_index = 0
+
 
 class HandAndHeadControl:
-    def __init__(self):
-        # 初始化手部识别
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(min_detection_confidence=0.8, min_tracking_confidence=0.8)
+    def __init__(self, backend=None, inference_size=None, roi_tracking=False, roi_padding=0.5, roi_min_size=160,
+                 redetect_interval=30, hands_interval=1, face_interval=1, prediction_max_age=0.5):
+        """
+        :param backend: 识别后端，perception_backends.BACKENDS 里的名字或 PerceptionBackend 实例，
+                        默认 'hands_face_mesh'（Hands + FaceMesh）
+        :param inference_size: 送进模型的最大尺寸 (width, height)，更大的图像会按比例缩小；
+                               返回的坐标仍是原始帧的像素坐标。None 表示不缩放
+        :param roi_tracking: 是否只在上一次头和手位置附近的裁剪区域里识别
+        :param roi_padding: 裁剪区域相对于关键点外接矩形向外扩展的比例
+        :param roi_min_size: 裁剪区域的最小边长（像素）
+        :param redetect_interval: 裁剪模式下每隔多少帧强制做一次整帧识别
+        :param hands_interval: 手部模型每隔多少帧运行一次
+        :param face_interval: 面部模型每隔多少帧运行一次；头部移动比出拳慢，可以调大。
+                              一个模型同时给出手和头时（如 Pose）按两者中较小的间隔运行
+        :param prediction_max_age: 跳过的帧上最多用多久以前的测量做外推（秒）
+        """
+        # 识别后端（默认 Hands + FaceMesh 两个模型）
+        self.backend = create_backend(backend)
+
+        # 预分配的 RGB / 缩放缓冲区，分辨率变化时才重新分配
+        self._rgb_buffer = None
+        self._resize_buffer = None
+        self.inference_size = inference_size
 
-        # 初始化面部识别
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(min_detection_confidence=0.8, min_tracking_confidence=0.8)
+        # ROI 跟踪状态
+        self.roi_tracking = roi_tracking
+        self.roi_padding = roi_padding
+        self.roi_min_size = roi_min_size
+        self.redetect_interval = redetect_interval
+        self._roi = None             # 当前裁剪区域，None 表示下一帧整帧识别
+        self._roi_targets = set()    # 建立 ROI 时检测到的目标（'head'/'left'/'right'）
+        self._roi_frames = 0         # 当前 ROI 已经使用的帧数
 
-        # 画图工具
-        self.mp_draw = mp.solutions.drawing_utils
+        # 分频调度：被跳过的模型用恒速预测补上
+        target_intervals = {'hands': hands_interval, 'face': face_interval}
+        self.scheduler = DetectionScheduler({model: min(target_intervals[target] for target in targets)
+                                             for model, targets in self.backend.outputs.items()})
+        self._predictors = {name: ConstantVelocityPredictor(max_age=prediction_max_age)
+                            for name in ('head', 'left', 'right')}
+
+    def _to_rgb(self, frame):
+        """
+        把 BGR 帧转换到复用的 RGB 缓冲区中，避免每帧分配新的整帧临时数组
+        """
+        if self._rgb_buffer is None or self._rgb_buffer.shape != frame.shape:
+            self._rgb_buffer = np.empty(frame.shape, dtype=np.uint8)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buffer)
+        return self._rgb_buffer
+
+    def _resize(self, image):
+        """
+        按 inference_size 等比缩小到复用的缓冲区中；不需要缩小时原样返回
+        """
+        if self.inference_size is None:
+            return image
+        height, width = image.shape[:2]
+        scale = min(self.inference_size[0] / width, self.inference_size[1] / height)
+        if scale >= 1.0:
+            return image
+        size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+        shape = (size[1], size[0], image.shape[2])
+        if self._resize_buffer is None or self._resize_buffer.shape != shape:
+            self._resize_buffer = np.empty(shape, dtype=np.uint8)
+        cv2.resize(image, size, dst=self._resize_buffer, interpolation=cv2.INTER_AREA)
+        return self._resize_buffer
+
+    def _prepare_input(self, frame, region):
+        """
+        按区域裁剪（只取视图，不拷贝）、缩小到推理尺寸，再转换成模型输入。
+        模型输出的是归一化坐标，只要记住区域就能映射回原始帧，和缩放比例无关
+        :param region: (x0, y0, x1, y1)，None 表示整帧
+        :return: (rgb 图像, 实际使用的区域)
+        """
+        height, width = frame.shape[:2]
+        if region is None:
+            region = (0, 0, width, height)
+        else:
+            x0, y0, x1, y1 = region
+            frame = frame[y0:y1, x0:x1]
+        # 先缩小再转换颜色，颜色转换只处理缩小后的像素
+        return self._to_rgb(self._resize(frame)), region
+
+    def reset_tracking(self):
+        """
+        丢弃当前的 ROI，下一帧重新整帧识别
+        """
+        self._roi = None
+        self._roi_targets = set()
+        self._roi_frames = 0
+
+    def process(self, frame, capture_time=None):
+        """
+        对同一帧只做一次颜色转换，依次运行手部和面部模型。
+        识别不会修改 frame，需要画关键点时用 landmark_overlay.LandmarkOverlay
+        :param frame: 捕获的图像帧（BGR）
+        :param capture_time: 帧的采集时间戳，默认取当前时间
+        :return: PerceptionResult 对象，包含 hands、head 和时间戳
+        """
+        if capture_time is None:
+            capture_time = time.perf_counter()
+
+        due = self.scheduler.tick()
+        roi = self._roi if self.roi_tracking else None
+        detections = {}
+        if due:
+            rgb_frame, region = self._prepare_input(frame, roi)
+            detections = self.backend.detect(rgb_frame, due)
+
+        if 'hands' in detections:
+            hands, hand_landmarks = self._extract_hands(detections['hands'], region)
+            for side in ('left', 'right'):
+                self._predictors[side].update(hand_landmarks[side], capture_time)
+        else:
+            hand_landmarks = {side: self._predictors[side].predict(capture_time) for side in ('left', 'right')}
+            hands = {side: landmarks_center(points) if points is not None else None
+                     for side, points in hand_landmarks.items()}
+
+        if 'face' in detections:
+            head_center, face_landmarks = self._extract_head(detections['face'], region)
+            self._predictors['head'].update(face_landmarks, capture_time)
+        else:
+            face_landmarks = self._predictors['head'].predict(capture_time)
+            head_center = landmarks_center(face_landmarks) if face_landmarks is not None else None
+
+        if self.roi_tracking:
+            self._update_roi(frame.shape, hand_landmarks, face_landmarks)
+        measured = {'head': 'face' in detections, 'left': 'hands' in detections, 'right': 'hands' in detections}
+        return PerceptionResult(hands, head_center, capture_time, time.perf_counter(),
+                                hand_landmarks, face_landmarks, roi, measured)
 
     def get_hands(self, frame):
         """
@@ -21,38 +302,9 @@ class HandAndHeadControl:
         :param frame: 捕获的图像帧
         :return: hands 对象，包含 left 和 right
         """
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb_frame)
-
-        hands = {'left': None, 'right': None}  # 初始化一个字典来存储左右手的中心坐标
-
-        if results.multi_hand_landmarks:
-            for idx, hand_landmarks in enumerate(results.multi_hand_landmarks):
-                hand_type = results.multi_handedness[idx].classification[0].label  # 获取是左手还是右手
-
-                # 计算手的中心坐标
-                x_sum = 0
-                y_sum = 0
-                for landmark in hand_landmarks.landmark:
-                    x_sum += landmark.x
-                    y_sum += landmark.y
-                center = (int((x_sum / len(hand_landmarks.landmark)) * frame.shape[1]),
-                          int((y_sum / len(hand_landmarks.landmark)) * frame.shape[0]))
-
-                # 根据手的类型存储中心坐标
-                if hand_type == 'Left':
-                    hands['left'] = center
-                elif hand_type == 'Right':
-                    hands['right'] = center
-
-                # 绘制手部关键点
-                for landmark in hand_landmarks.landmark:
-                    x, y = int(landmark.x * frame.shape[1]), int(landmark.y * frame.shape[0])
-                    cv2.circle(frame, (x, y), 5, (0, 255, 0), -1)  # 绿色圆点标记关键点
-                # 绘制手部连接线
-                self.mp_draw.draw_landmarks(frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
-
-        return hands
+        rgb_frame, region = self._prepare_input(frame, None)
+        detections = self.backend.detect(rgb_frame, self._models_for('hands'))
+        return self._extract_hands(detections['hands'], region)[0]
 
     def get_head_center(self, frame):
         """
@@ -60,24 +312,86 @@ class HandAndHeadControl:
         :param frame: 捕获的图像帧
         :return: 头部的中心坐标 (x, y)
         """
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(rgb_frame)
-
-        head_center = None
-
-        if results.multi_face_landmarks:
-            for face_landmark in results.multi_face_landmarks:
-                # 计算面部关键点的平均坐标作为头部中心
-                x_sum = 0
-                y_sum = 0
-                for landmark in face_landmark.landmark:
-                    x_sum += landmark.x
-                    y_sum += landmark.y
-                head_center = (int((x_sum / len(face_landmark.landmark)) * frame.shape[1]),
-                               int((y_sum / len(face_landmark.landmark)) * frame.shape[0]))
-                # 在图像上绘制面部关键点
-                for landmark in face_landmark.landmark:
-                    x, y = int(landmark.x * frame.shape[1]), int(landmark.y * frame.shape[0])
-                    cv2.circle(frame, (x, y), 1, (0, 0, 255), -1)  # 红色圆点标记面部关键点
-
-        return head_center
+        rgb_frame, region = self._prepare_input(frame, None)
+        detections = self.backend.detect(rgb_frame, self._models_for('face'))
+        return self._extract_head(detections['face'], region)[0]
+
+    def _models_for(self, target):
+        """
+        能给出 target（'hands' 或 'face'）的模型名
+        """
+        return {model for model, targets in self.backend.outputs.items() if target in targets}
+
+    def _update_roi(self, frame_shape, hand_landmarks, face_landmarks):
+        """
+        根据本帧的关键点更新裁剪区域：
+        跟丢目标或到了强制重检的帧数时回到整帧识别；关键点靠近 ROI 边缘时重新计算 ROI
+        """
+        tracked = {'head': face_landmarks, 'left': hand_landmarks['left'], 'right': hand_landmarks['right']}
+        present = {name for name, points in tracked.items() if points is not None}
+
+        if self._roi is not None:
+            self._roi_frames += 1
+            lost = not self._roi_targets <= present
+            if not present or lost or self._roi_frames >= self.redetect_interval:
+                self.reset_tracking()
+                return
+
+        points = np.concatenate([tracked[name][:, :2] for name in present], axis=0) if present else None
+        if points is None:
+            return
+        if self._roi is not None and not self._near_roi_edge(points):
+            return
+
+        roi = self._compute_roi(points, frame_shape)
+        if roi is None:
+            self.reset_tracking()
+            return
+        self._roi = roi
+        self._roi_targets = present
+        self._roi_frames = 0
+
+    def _near_roi_edge(self, points):
+        x0, y0, x1, y1 = self._roi
+        margin_x = (x1 - x0) * 0.1
+        margin_y = (y1 - y0) * 0.1
+        mins = points.min(axis=0)
+        maxs = points.max(axis=0)
+        return (mins[0] < x0 + margin_x or mins[1] < y0 + margin_y or
+                maxs[0] > x1 - margin_x or maxs[1] > y1 - margin_y)
+
+    def _compute_roi(self, points, frame_shape):
+        """
+        关键点外接矩形向外扩展后的裁剪区域；裁剪区域接近整帧时返回 None
+        """
+        height, width = frame_shape[:2]
+        (x_min, y_min), (x_max, y_max) = points.min(axis=0), points.max(axis=0)
+        half_w = max((x_max - x_min) * (1 + 2 * self.roi_padding), self.roi_min_size) / 2
+        half_h = max((y_max - y_min) * (1 + 2 * self.roi_padding), self.roi_min_size) / 2
+        cx, cy = (x_min + x_max) / 2, (y_min + y_max) / 2
+
+        x0, x1 = max(0, int(cx - half_w)), min(width, int(cx + half_w))
+        y0, y1 = max(0, int(cy - half_h)), min(height, int(cy + half_h))
+        if (x1 - x0) * (y1 - y0) > 0.8 * width * height:
+            return None
+        return x0, y0, x1, y1
+
+    def _extract_hands(self, hand_points, region):
+        hands = {'left': None, 'right': None}  # 初始化一个字典来存储左右手的中心坐标
+        hand_landmarks = {'left': None, 'right': None}
+
+        for side, points in hand_points.items():
+            if points is None:
+                continue
+            # 关键点只转换一次，中心坐标用向量化的平均值计算
+            hand_landmarks[side] = to_frame_coords(points, region)
+            hands[side] = landmarks_center(hand_landmarks[side])
+
+        return hands, hand_landmarks
+
+    def _extract_head(self, face_points, region):
+        if face_points is None:
+            return None, None
+        # 面部关键点的平均坐标作为头部中心
+        face_landmarks = to_frame_coords(face_points, region)
+        return landmarks_center(face_landmarks), face_landmarks
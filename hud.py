@@ -0,0 +1,84 @@
+# hud.py
+import pygame
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+
+
+class HUD:
+    """
+    游戏界面里不常变化的部分：字体和文字只创建、渲染一次，
+    底色、地面、血条边框和操作提示预先合成到 background 上，每帧整张贴（或交给脏矩形渲染器恢复）；
+    血条只在血量变化时重新渲染。
+    """
+
+    def __init__(self, width, height, ground_y, bar_colors, hints=(), bar_size=(200, 20), bar_margin=50,
+                 bar_y=30, background_color=WHITE, frame_color=BLACK, hint_size=24):
+        """
+        :param ground_y: 地面线的 y 坐标
+        :param bar_colors: (左边血条颜色, 右边血条颜色)
+        :param hints: 操作提示 [(文字, (x, y)), ...]
+        """
+        self.bar_colors = bar_colors
+        self.bar_size = bar_size
+        self.frame_color = frame_color
+        bar_w, bar_h = bar_size
+        self.bar_rects = (pygame.Rect(bar_margin, bar_y, bar_w, bar_h),
+                          pygame.Rect(width - bar_margin - bar_w, bar_y, bar_w, bar_h))
+
+        self._fonts = {}
+        self._texts = {}
+
+        self.background = pygame.Surface((width, height))
+        self.background.fill(background_color)
+        pygame.draw.line(self.background, frame_color, (0, ground_y), (width, ground_y), 5)
+        for rect in self.bar_rects:
+            pygame.draw.rect(self.background, frame_color, rect)
+        for message, pos in hints:
+            self.background.blit(self.text(message, hint_size, frame_color), pos)
+        # 转成屏幕的像素格式，每帧整张贴或按脏矩形恢复时不再逐像素转换格式（需要先创建窗口）
+        if pygame.display.get_surface() is not None:
+            self.background = self.background.convert()
+
+        # 每个血条渲染好的 Surface 和对应的血量，血量不变时直接复用
+        self._bars = [None, None]
+        self._bar_health = [None, None]
+
+    def font(self, size):
+        """
+        SysFont 查找很慢，同一字号只创建一次
+        """
+        font = self._fonts.get(size)
+        if font is None:
+            font = self._fonts[size] = pygame.font.SysFont(None, size)
+        return font
+
+    def text(self, message, size, color):
+        """
+        渲染好的文字按 (内容, 字号, 颜色) 缓存
+        """
+        key = (message, size, color)
+        surface = self._texts.get(key)
+        if surface is None:
+            surface = self._texts[key] = self.font(size).render(message, True, color)
+        return surface
+
+    def _render_bar(self, index, health):
+        bar_w, bar_h = self.bar_size
+        surface = pygame.Surface(self.bar_size)
+        surface.fill(self.frame_color)
+        surface.fill(self.bar_colors[index], (0, 0, (max(0, health) / 100) * bar_w, bar_h))
+        return surface
+
+    def draw_health_bars(self, screen, *healths):
+        """
+        画两个玩家的血条
+        :return: 两个血条的 Rect 列表
+        """
+        rects = []
+        for index, health in enumerate(healths):
+            if health != self._bar_health[index]:
+                self._bars[index] = self._render_bar(index, health)
+                self._bar_health[index] = health
+            rects.append(screen.blit(self._bars[index], self.bar_rects[index]))
+        return rects
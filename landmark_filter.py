@@ -0,0 +1,155 @@
+# landmark_filter.py
+import math
+
+import numpy as np
+
+
+class LandmarkFilter:
+    """
+    单条轨迹（头部或一只手的中心点）的滤波器接口，放在识别结果和动作分析之间。
+
+    update(point, t): 输入一帧的 (x, y) 和采集时间戳（秒），返回滤波后的 (x, y)；
+        point 为 None（这一帧没检测到）时返回 None，内部状态保留，下一次用更长的 dt 继续
+    velocity: 当前的速度估计 (vx, vy)，像素/秒，动作判断可以直接用它，不必等一个完整窗口；
+        没检测到的帧为 (0, 0)，避免手离开画面后一直按最后的速度重复触发动作
+    reset(): 清空状态；两次检测的间隔超过 max_gap 秒时也会自动重置
+    """
+
+    def __init__(self, max_gap=0.5):
+        self.max_gap = max_gap
+        self._last_time = None
+        self.velocity = (0.0, 0.0)
+
+    def reset(self):
+        self._last_time = None
+        self.velocity = (0.0, 0.0)
+
+    def update(self, point, t):
+        if point is None:
+            self.velocity = (0.0, 0.0)
+            return None
+        z = np.asarray(point, dtype=np.float64)[:2]
+        if self._last_time is None or t - self._last_time > self.max_gap:
+            self._init(z)
+            self.velocity = (0.0, 0.0)
+        else:
+            dt = t - self._last_time
+            if dt > 0:
+                self._step(z, dt)
+        self._last_time = t
+        x, y = self._position()
+        return x, y
+
+    def _init(self, z):
+        raise NotImplementedError
+
+    def _step(self, z, dt):
+        raise NotImplementedError
+
+    def _position(self):
+        raise NotImplementedError
+
+
+class OneEuroFilter(LandmarkFilter):
+    """
+    One-Euro 滤波：静止时截止频率低、抖动被压住，移动越快截止频率越高、延迟越小
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0, max_gap=0.5):
+        """
+        :param min_cutoff: 静止时的截止频率（Hz），越小越平滑
+        :param beta: 截止频率随速度（像素/秒）增加的系数，越大快速动作的延迟越小
+        :param d_cutoff: 速度估计本身的截止频率（Hz）
+        """
+        super().__init__(max_gap)
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self._x = None
+        self._dx = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def _init(self, z):
+        self._x = z
+        self._dx = np.zeros(2)
+
+    def _step(self, z, dt):
+        a_d = self._alpha(self.d_cutoff, dt)
+        self._dx = self._dx + a_d * ((z - self._x) / dt - self._dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self._dx)
+        a = self._alpha(cutoff, dt)
+        self._x = self._x + a * (z - self._x)
+        vx, vy = self._dx
+        self.velocity = (vx, vy)
+
+    def _position(self):
+        return self._x
+
+
+class KalmanFilter(LandmarkFilter):
+    """
+    恒速模型的卡尔曼滤波，状态为每个坐标轴的 (位置, 速度)，两个轴独立、一起向量化更新
+    """
+
+    def __init__(self, acceleration_std=500.0, measurement_std=3.0, max_gap=0.5):
+        """
+        :param acceleration_std: 过程噪声，加速度的标准差（像素/秒²），越大越跟手
+        :param measurement_std: 识别中心点的抖动（像素），越大越平滑
+        """
+        super().__init__(max_gap)
+        self.q = acceleration_std ** 2
+        self.r = measurement_std ** 2
+        self._p = None
+        self._v = None
+        self._cov = None  # 每个轴的协方差 (P00, P01, P11)，形状 (3, 2)
+
+    def _init(self, z):
+        self._p = z
+        self._v = np.zeros(2)
+        # 初始速度未知：方差取 max_gap 内以过程噪声加速所能达到的速度
+        v_var = self.q * self.max_gap ** 2
+        self._cov = np.array([[self.r, self.r], [0.0, 0.0], [v_var, v_var]])
+
+    def _step(self, z, dt):
+        p00, p01, p11 = self._cov
+        q = self.q
+
+        # 预测
+        p = self._p + self._v * dt
+        p00 = p00 + dt * (2 * p01 + dt * p11) + q * dt ** 4 / 4
+        p01 = p01 + dt * p11 + q * dt ** 3 / 2
+        p11 = p11 + q * dt ** 2
+
+        # 更新
+        s = p00 + self.r
+        k0, k1 = p00 / s, p01 / s
+        innovation = z - p
+        self._p = p + k0 * innovation
+        self._v = self._v + k1 * innovation
+        self._cov = np.array([(1 - k0) * p00, (1 - k0) * p01, p11 - k1 * p01])
+        vx, vy = self._v
+        self.velocity = (vx, vy)
+
+    def _position(self):
+        return self._p
+
+
+FILTERS = {
+    'one_euro': OneEuroFilter,
+    'kalman': KalmanFilter,
+}
+
+
+def create_filter(landmark_filter=None, **kwargs):
+    """
+    :param landmark_filter: FILTERS 里的名字、LandmarkFilter 实例，或 None（不滤波）
+    """
+    if landmark_filter is None or isinstance(landmark_filter, LandmarkFilter):
+        return landmark_filter
+    if landmark_filter not in FILTERS:
+        raise ValueError(f"未知的关键点滤波器: {landmark_filter}，可选: {', '.join(FILTERS)}")
+    return FILTERS[landmark_filter](**kwargs)
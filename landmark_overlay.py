@@ -0,0 +1,88 @@
+# landmark_overlay.py
+import numpy as np
+
+# MediaPipe Hands 的关键点数
+HAND_POINTS = 21
+# MediaPipe 手部 21 个关键点之间的连接关系
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+
+def _disk_offsets(radius):
+    """
+    半径为 radius 的实心圆内所有像素相对圆心的偏移，形状 (K, 2)，每行 (dx, dy)
+    """
+    r = max(0, int(radius))
+    ys, xs = np.mgrid[-r:r + 1, -r:r + 1]
+    inside = xs * xs + ys * ys <= r * r
+    return np.stack([xs[inside], ys[inside]], axis=1).astype(np.int32)
+
+
+def _stamp(layer, points, offsets, color):
+    """
+    一次性把所有点按 offsets 的形状画到 layer 上
+    :param points: (M, 2) 像素坐标
+    """
+    if len(points) == 0:
+        return
+    pixels = (np.rint(points).astype(np.int32)[:, None, :] + offsets[None, :, :]).reshape(-1, 2)
+    height, width = layer.shape[:2]
+    inside = (pixels[:, 0] >= 0) & (pixels[:, 0] < width) & (pixels[:, 1] >= 0) & (pixels[:, 1] < height)
+    pixels = pixels[inside]
+    layer[pixels[:, 1], pixels[:, 0]] = color
+
+
+class LandmarkOverlay:
+    """
+    可选的调试叠加层：把 PerceptionResult 里的关键点批量画到一份复用的图像上。
+    识别本身不再修改输入帧，只有需要预览时才调用 draw()。
+    """
+
+    def __init__(self, hand_radius=5, face_radius=1, hand_color=(0, 255, 0), face_color=(0, 0, 255),
+                 connection_color=(224, 224, 224), draw_connections=True, segment_samples=24):
+        self.hand_color = hand_color
+        self.face_color = face_color
+        self.connection_color = connection_color
+        self.draw_connections = draw_connections
+
+        self._hand_offsets = _disk_offsets(hand_radius)
+        self._face_offsets = _disk_offsets(face_radius)
+        self._line_offsets = _disk_offsets(1)
+        self._segment_t = np.linspace(0.0, 1.0, segment_samples, dtype=np.float32)[None, :, None]
+        self._connections = np.array(HAND_CONNECTIONS, dtype=np.intp)
+
+        # 复用的叠加层，分辨率变化时才重新分配
+        self._layer = None
+
+    def draw(self, frame, result):
+        """
+        把识别结果画在 frame 的副本上
+        :param frame: 原始 BGR 帧（不会被修改）
+        :param result: HandAndHeadControl.process() 返回的 PerceptionResult
+        :return: 画好关键点的图像，下次调用 draw() 时会被覆盖
+        """
+        if self._layer is None or self._layer.shape != frame.shape:
+            self._layer = np.empty_like(frame)
+        np.copyto(self._layer, frame)
+
+        hands = [points[:, :2] for points in result.hand_landmarks.values() if points is not None]
+        if hands:
+            # 连线只对 Hands 的 21 点手部有意义；Pose 等后端给出的手部只有几个点，只画点
+            full_hands = [points for points in hands if len(points) == HAND_POINTS]
+            if self.draw_connections and full_hands:
+                segments = [points[self._connections] for points in full_hands]  # (C, 2, 2)
+                segments = np.concatenate(segments, axis=0)
+                start, end = segments[:, None, 0, :], segments[:, None, 1, :]
+                line_points = (start + (end - start) * self._segment_t).reshape(-1, 2)
+                _stamp(self._layer, line_points, self._line_offsets, self.connection_color)
+            _stamp(self._layer, np.concatenate(hands, axis=0), self._hand_offsets, self.hand_color)
+
+        if result.face_landmarks is not None:
+            _stamp(self._layer, result.face_landmarks[:, :2], self._face_offsets, self.face_color)
+
+        return self._layer
@@ -1,11 +1,15 @@
 # main_game_dual_camera.py
 import pygame
 import sys
+import time
 import cv2
 from head_and_hand import HandAndHeadControl
+from camera_stream import ThreadedCapture
+from landmark_overlay import LandmarkOverlay
 from stickman import StickMan
-from collections import deque
-from movement_analyzer import MovementAnalyzer
+from fixed_timestep import FixedTimestep, InputLatch
+from movement_analyzer import (StreamingMovementAnalyzer, classify, GESTURE_JUMP, GESTURE_ATTACK_LEFT,
+                               GESTURE_ATTACK_RIGHT, GESTURE_DEFEND)
 
 pygame.init()
 WIDTH, HEIGHT = 800, 600
@@ -19,13 +23,44 @@ BLUE = (0, 0, 255)
 
 clock = pygame.time.Clock()
 FPS = 30
+NO_HANDS = {'left': None, 'right': None}
+SHOW_LANDMARK_OVERLAY = False  # 在摄像头预览里画出手部和面部关键点（调试用）
+# 固定模拟步长（秒）：StickMan 的计时器和重力按步计数，动作快慢不受渲染帧率和识别卡顿影响
+SIM_STEP = 1 / 30
+
+
+def follow_head(player, target_x):
+    """
+    一个模拟步：火柴人向头部映射出的目标横坐标靠近 30%
+    """
+    if target_x is None:
+        return
+    delta = abs(target_x - player.x)
+    player.x += 0.3 * (target_x - player.x)
+    player.x = max(50, min(WIDTH - 50, player.x))
+    player.is_moving = delta > 1  # ✅ 只要位置有明显变化就认为在“移动”
+
+
+def apply_gestures(player, gestures):
+    """
+    一个模拟步：按锁存的动作位掩码触发跳跃、出拳、防御
+    """
+    if gestures & GESTURE_JUMP:
+        player.jump()
+    if gestures & GESTURE_ATTACK_LEFT:
+        player.attack_left()
+    if gestures & GESTURE_ATTACK_RIGHT:
+        player.attack_right()
+    if gestures & GESTURE_DEFEND:
+        player.defend()
+
 
 player1 = StickMan(200, 400, RED)
 player2 = StickMan(600, 400, BLUE, flip=True)
 
 # === 双摄像头 ===
-cap1 = cv2.VideoCapture(0)  # 控制 player1
-cap2 = cv2.VideoCapture(1)  # 控制 player2
+cap1 = ThreadedCapture(0).start()  # 控制 player1
+cap2 = ThreadedCapture(1).start()  # 控制 player2
 
 # 获取摄像头图像宽度（用于头部位置映射）
 cam1_width = cap1.get(cv2.CAP_PROP_FRAME_WIDTH)
@@ -33,25 +68,28 @@ cam2_width = cap2.get(cv2.CAP_PROP_FRAME_WIDTH)
 
 hand_and_head_control1 = HandAndHeadControl()
 hand_and_head_control2 = HandAndHeadControl()
-movement_analyzer = MovementAnalyzer()
+landmark_overlay1 = LandmarkOverlay()
+landmark_overlay2 = LandmarkOverlay()
 
-hand_sequence_length = 15
-head_sequence_length = 30
+# === Player 1 动作窗口（按时间窗口判断，和帧率无关）===
+motion1 = StreamingMovementAnalyzer()
 
-# === Player 1 序列 ===
-left_hand_seq1 = deque(maxlen=hand_sequence_length)
-right_hand_seq1 = deque(maxlen=hand_sequence_length)
-head_seq1 = deque(maxlen=head_sequence_length)
+# === Player 2 动作窗口（按时间窗口判断，和帧率无关）===
+motion2 = StreamingMovementAnalyzer()
 
-# === Player 2 序列 ===
-left_hand_seq2 = deque(maxlen=hand_sequence_length)
-right_hand_seq2 = deque(maxlen=hand_sequence_length)
-head_seq2 = deque(maxlen=head_sequence_length)
+timestep = FixedTimestep(SIM_STEP)
+# 每帧判断出的动作锁存到模拟步上，由下一个模拟步取走
+latch1 = InputLatch()
+latch2 = InputLatch()
+# 头部映射出的目标横坐标，识别没有新结果时保持上一次的目标
+target_x1 = target_x2 = None
 
 running = True
 while running:
-    ret1, frame1 = cap1.read()
-    ret2, frame2 = cap2.read()
+    # 两个摄像头共用一帧的等待时间，第二个只等剩下的部分
+    deadline = time.perf_counter() + 1 / FPS
+    ret1, frame1, capture_time1, fresh1 = cap1.read(timeout=1 / FPS)
+    ret2, frame2, capture_time2, fresh2 = cap2.read(timeout=max(0.0, deadline - time.perf_counter()))
 
     if not ret1 or not ret2:
         print("❌ 摄像头读取失败")
@@ -60,19 +98,25 @@ while running:
     frame1 = cv2.flip(frame1, 1)
     frame2 = cv2.flip(frame2, 1)
 
+    # === 识别：等待超时拿到的是上一帧，不重复识别，也不往轨迹里重复记录同一个时间戳 ===
+    result1 = hand_and_head_control1.process(frame1, capture_time1) if fresh1 else None
+    result2 = hand_and_head_control2.process(frame2, capture_time2) if fresh2 else None
+    hands1, head1 = (result1.hands, result1.head) if result1 else (NO_HANDS, None)
+    hands2, head2 = (result2.hands, result2.head) if result2 else (NO_HANDS, None)
+
     # === Player 1 识别 ===
-    hands1 = hand_and_head_control1.get_hands(frame1)
-    head1 = hand_and_head_control1.get_head_center(frame1)
-    if hands1['left']: left_hand_seq1.append(hands1['left'])
-    if hands1['right']: right_hand_seq1.append(hands1['right'])
-    if head1: head_seq1.append(head1)
+    if result1:
+        motion1.push(head1, hands1['left'], hands1['right'], result1.capture_time)
 
     # === Player 2 识别 ===
-    hands2 = hand_and_head_control2.get_hands(frame2)
-    head2 = hand_and_head_control2.get_head_center(frame2)
-    if hands2['left']: left_hand_seq2.append(hands2['left'])
-    if hands2['right']: right_hand_seq2.append(hands2['right'])
-    if head2: head_seq2.append(head2)
+    if result2:
+        motion2.push(head2, hands2['left'], hands2['right'], result2.capture_time)
+
+    if SHOW_LANDMARK_OVERLAY:
+        if result1:
+            frame1 = landmark_overlay1.draw(frame1, result1)
+        if result2:
+            frame2 = landmark_overlay2.draw(frame2, result2)
 
     # 显示摄像头图像（可选）
     cv2.imshow("Player1 Camera", frame1)
@@ -85,57 +129,32 @@ while running:
         if event.type == pygame.QUIT:
             running = False
 
-    # === Player 1 用头部控制横向位置 ===
+    # === 用头部控制横向位置（目标在这里更新，靠近目标在模拟步里做）===
     if head1 and cam1_width:
         target_x1 = int(head1[0] / cam1_width * WIDTH)
-        delta = abs(target_x1 - player1.x)
-        player1.x += 0.3 * (target_x1 - player1.x)
-        player1.x = max(50, min(WIDTH - 50, player1.x))
-        player1.is_moving = delta > 1  # ✅ 只要位置有明显变化就认为在“移动”
+    if head2 and cam2_width:
+        target_x2 = int(head2[0] / cam2_width * WIDTH)
 
+    # 两个玩家的动作一次算完（头部窗口没填满时为 0），锁存到接下来的模拟步
+    gestures1, gestures2 = classify([motion1, motion2])
+    latch1.push(gestures1)
+    latch2.push(gestures2)
 
-    # === Player 2 用头部控制横向位置 ===
-    # === Player 1 用头部控制横向位置 ===
-    if head2 and cam2_width:
-        target_x2 = int(head1[0] / cam2_width * WIDTH)
-        delta = abs(target_x2 - player2.x)
-        player2.x += 0.3 * (target_x2 - player2.x)
-        player2.x = max(50, min(WIDTH - 50, player2.x))
-        player2.is_moving = delta > 1  # ✅ 只要位置有明显变化就认为在“移动”
-
-
-    # === Player 1 动作判断 ===
-    player1.is_moving = False
-    if len(head_seq1) == head_sequence_length:
-        if movement_analyzer.is_jumping(head_seq1, -1):
-            player1.jump()
-        if movement_analyzer.is_attacking_left(left_hand_seq1, -1):
-            player1.attack_left()
-        if movement_analyzer.is_attacking_right(right_hand_seq1, -1):
-            player1.attack_right()
-        if movement_analyzer.is_defending(left_hand_seq1, right_hand_seq1, head_seq1, -1, -1):
-            player1.defend()
-
-    # === Player 2 动作判断 ===
-    player2.is_moving = False
-    if len(head_seq2) == head_sequence_length:
-        if movement_analyzer.is_jumping(head_seq2, -1):
-            player2.jump()
-        if movement_analyzer.is_attacking_left(left_hand_seq2, -1):
-            player2.attack_left()
-        if movement_analyzer.is_attacking_right(right_hand_seq2, -1):
-            player2.attack_right()
-        if movement_analyzer.is_defending(left_hand_seq2, right_hand_seq2, head_seq2, -1, -1):
-            player2.defend()
-
-    # 边界限制
-    player1.x = max(50, min(player1.x, WIDTH - 50))
-    player2.x = max(50, min(player2.x, WIDTH - 50))
-
-    player1.update(player2)
-    player2.update(player1)
-    player1.check_hit(player2)
-    player2.check_hit(player1)
+    # === 固定步长模拟：按实际经过的时间跑 0 到若干步，识别卡顿时补跑，动作不会变慢 ===
+    for _ in range(timestep.advance()):
+        apply_gestures(player1, latch1.pop())
+        apply_gestures(player2, latch2.pop())
+        follow_head(player1, target_x1)
+        follow_head(player2, target_x2)
+
+        # 边界限制
+        player1.x = max(50, min(player1.x, WIDTH - 50))
+        player2.x = max(50, min(player2.x, WIDTH - 50))
+
+        player1.update(player2)
+        player2.update(player1)
+        player1.check_hit(player2)
+        player2.check_hit(player1)
 
     # UI
     pygame.draw.line(screen, BLACK, (0, 450), (WIDTH, 450), 5)
@@ -147,8 +166,9 @@ while running:
     pygame.draw.rect(screen, BLACK, (WIDTH - 250, 30, bar_w, bar_h))
     pygame.draw.rect(screen, BLUE, (WIDTH - 250, 30, (player2.health / 100) * bar_w, bar_h))
 
-    player1.draw(screen)
-    player2.draw(screen)
+    # 在最近两个模拟状态之间插值
+    player1.draw(screen, timestep.alpha)
+    player2.draw(screen, timestep.alpha)
 
     pygame.display.flip()
     clock.tick(FPS)
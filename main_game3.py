@@ -1,233 +1,359 @@
 # main_game_dual_camera.py
 import pygame
+import os
 import sys
+import time
 import cv2
 from head_and_hand import HandAndHeadControl
+from camera_stream import ThreadedCapture
+from perception_worker import PerceptionWorker
+from landmark_overlay import LandmarkOverlay
+from gesture_tuning import TrajectoryRecorder
 from stickman import StickMan
-from collections import deque
-from movement_analyzer import MovementAnalyzer
-import numpy as np
+from dirty_renderer import DirtyRectRenderer
+from hud import HUD
+from camera_preview import CameraPreview
+from fixed_timestep import FixedTimestep, InputLatch
+from movement_analyzer import (StreamingMovementAnalyzer, classify, GESTURE_JUMP, GESTURE_ATTACK_LEFT,
+                               GESTURE_ATTACK_RIGHT, GESTURE_DEFEND)
+
 
-pygame.init()
 WIDTH, HEIGHT = 1200, 800  # 🎯 放大游戏画布
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Stickman Dual Camera Battle")
 
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 RED = (255, 0, 0)
 BLUE = (0, 0, 255)
 
-clock = pygame.time.Clock()
 FPS = 30
-
-player1 = StickMan(300, 550, RED)  # 修正初始地面高度为 650（避免卡在“虚假地面”）
-player2 = StickMan(900, 550, BLUE, flip=True)
-
-winner = None
-game_over = False
-font_large = pygame.font.SysFont(None, 72)
-font_small = pygame.font.SysFont(None, 36)  
-
-# === 双摄像头 ===
-cap1 = cv2.VideoCapture(0)  # 控制 player1
-cap2 = cv2.VideoCapture(1)  # 控制 player2
-
-# 获取摄像头图像宽度（用于头部位置映射）
-cam1_width = cap1.get(cv2.CAP_PROP_FRAME_WIDTH)
-cam2_width = cap2.get(cv2.CAP_PROP_FRAME_WIDTH)
-
-hand_and_head_control1 = HandAndHeadControl()
-hand_and_head_control2 = HandAndHeadControl()
-movement_analyzer = MovementAnalyzer()
-
-hand_sequence_length = 15
-head_sequence_length = 30
-
-# === Player 1 序列 ===
-left_hand_seq1 = deque(maxlen=hand_sequence_length)
-right_hand_seq1 = deque(maxlen=hand_sequence_length)
-head_seq1 = deque(maxlen=head_sequence_length)
-
-# === Player 2 序列 ===
-left_hand_seq2 = deque(maxlen=hand_sequence_length)
-right_hand_seq2 = deque(maxlen=hand_sequence_length)
-head_seq2 = deque(maxlen=head_sequence_length)
-
-running = True
-while running:
-    ret1, frame1 = cap1.read()
-    ret2, frame2 = cap2.read()
-
-    if not ret1 or not ret2:
-        print("⚠️ 摄像头读取失败，跳过此帧")
-        continue
-
-    frame1 = cv2.flip(frame1, 1)  
-    frame2 = cv2.flip(frame2, 1)
-    #cv2.imshow("Camera 1", frame1)
-    #cv2.imshow("Camera 2", frame2)
-
-    # === Player 1 识别 ===
-    hands1 = hand_and_head_control1.get_hands(frame1)
-    head1 = hand_and_head_control1.get_head_center(frame1)
-    if hands1['left']: left_hand_seq1.append(hands1['left'])
-    if hands1['right']: right_hand_seq1.append(hands1['right'])
-    if head1: head_seq1.append(head1)
-
-    # === Player 2 识别 ===
-    hands2 = hand_and_head_control2.get_hands(frame2)
-    head2 = hand_and_head_control2.get_head_center(frame2)
-    if hands2['left']: left_hand_seq2.append(hands2['left'])
-    if hands2['right']: right_hand_seq2.append(hands2['right'])
-    if head2: head_seq2.append(head2)
-
-    screen.fill(WHITE)
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-    # === Player 1 用头部控制横向位置 ===
-    if head1 and cam1_width:
-        target_x1 = int(head1[0] / cam1_width * WIDTH)
-        delta1 = abs(target_x1 - player1.x)
-        player1.x += 0.3 * (target_x1 - player1.x)
-        player1.x = max(50, min(WIDTH - 50, player1.x))
-        player1.is_moving = delta1 > 1
-
-    # === Player 2 用头部控制横向位置 ===
-    if head2 and cam2_width:
-        target_x2 = int(head2[0] / cam2_width * WIDTH)
-        delta2 = abs(target_x2 - player2.x)
-        player2.x += 0.3 * (target_x2 - player2.x)
-        player2.x = max(50, min(WIDTH - 50, player2.x))
-        player2.is_moving = delta2 > 1
-
-    # === Player 1 动作判断 ===
-    if len(head_seq1) == head_sequence_length:
-        if movement_analyzer.is_jumping(head_seq1, -1):
-            player1.jump()
-        if movement_analyzer.is_attacking_left(left_hand_seq1, -1):
-            player1.attack_left()
-        if movement_analyzer.is_attacking_right(right_hand_seq1, -1):
-            player1.attack_right()
-        if movement_analyzer.is_defending(left_hand_seq1, right_hand_seq1, head_seq1, -1, -1):
-            player1.defend()
-
-    # === Player 2 动作判断 ===
-    if len(head_seq2) == head_sequence_length:
-        if movement_analyzer.is_jumping(head_seq2, -1):
-            player2.jump()
-        if movement_analyzer.is_attacking_left(left_hand_seq2, -1):
-            player2.attack_left()
-        if movement_analyzer.is_attacking_right(right_hand_seq2, -1):
-            player2.attack_right()
-        if movement_analyzer.is_defending(left_hand_seq2, right_hand_seq2, head_seq2, -1, -1):
-            player2.defend()
-
-    # 边界限制
-    player1.x = max(50, min(player1.x, WIDTH - 50))
-    player2.x = max(50, min(player2.x, WIDTH - 50))
-
-    player1.update(player2)
-    player2.update(player1)
-    player1.check_hit(player2)
-    player2.check_hit(player1)
-    
-    # 判断胜负
-    if player1.health <= 0:
-        winner = "Player 2"
-        game_over = True
-    elif player2.health <= 0:
-        winner = "Player 1"
-        game_over = True
-
-
-    # UI
-    pygame.draw.line(screen, BLACK, (0, 550), (WIDTH, 550), 5)
-
-    bar_w, bar_h = 200, 20
-    pygame.draw.rect(screen, BLACK, (50, 30, bar_w, bar_h))
-    pygame.draw.rect(screen, RED, (50, 30, (player1.health / 100) * bar_w, bar_h))
-
-    pygame.draw.rect(screen, BLACK, (WIDTH - 250, 30, bar_w, bar_h))
-    pygame.draw.rect(screen, BLUE, (WIDTH - 250, 30, (player2.health / 100) * bar_w, bar_h))
-
-    player1.draw(screen)
-    player2.draw(screen)
-
-    # === 摄像头画面嵌入为两个小窗口 ===
-    def draw_camera_window(frame, pos):
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame_resized = cv2.resize(frame_rgb, (200, 150))
-        surface = pygame.surfarray.make_surface(np.rot90(frame_resized))
-        surface = pygame.transform.flip(surface, True, False)  # 不再翻转（摄像头已经处理了）
-        screen.blit(surface, pos)
-
-
-
-    draw_camera_window(frame1, (20, HEIGHT - 170))
-    draw_camera_window(frame2, (WIDTH - 220, HEIGHT - 170))
-
-    # 显示胜利结算画面
-    if game_over:
-        screen.fill(WHITE)
-        
-        # 胜者文字
-        text = font_large.render(f"{winner} Wins!", True, (0, 128, 0))
-        screen.blit(text, ((WIDTH - text.get_width()) // 2, HEIGHT // 2 - 100))
-
-        # 重新开始
-        restart_text = font_small.render("Press R to Restart", True, BLACK)
-        screen.blit(restart_text, ((WIDTH - restart_text.get_width()) // 2, HEIGHT // 2))
-
-        # 退出游戏
-        quit_text = font_small.render("Press Q to Quit", True, BLACK)
-        screen.blit(quit_text, ((WIDTH - quit_text.get_width()) // 2, HEIGHT // 2 + 50))
-
-        pygame.display.flip()
-
-        restart_requested = False
-
-        while True:
+NO_HANDS = {'left': None, 'right': None}
+
+# 识别方式：
+# 'workers' - 每个摄像头的识别放到独立进程里跑（帧通过共享内存传递）
+# 'async'   - MediaPipe Tasks LIVE_STREAM 异步识别，模型忙时丢帧（需要 models/ 下的 .task 模型文件）
+# 'inline'  - 在主线程里依次识别
+PERCEPTION_MODE = 'workers'
+# HandAndHeadControl 的参数（三种方式共用；'async' 只支持 backend、inference_size 和两个 interval，
+# 后端只能是 'hands_face_mesh'，见 AsyncHandAndHeadControl）
+PERCEPTION_OPTIONS = {
+    # 识别后端：'hands_face_mesh'（默认，两个模型）、'face_detection'（人脸框代替 FaceMesh）、
+    # 'pose'（一个 Pose 模型同时给出头和双手，推理开销约减半）
+    'backend': 'hands_face_mesh',
+    # 送进 MediaPipe 的最大分辨率，例如 (320, 240)；低配电脑上可以调小，坐标仍按摄像头原始分辨率返回
+    'inference_size': None,
+    # 面部模型最贵、头部移动又慢，每 2 帧跑一次，中间帧用恒速预测；手部每帧都跑
+    'face_interval': 2,
+    'hands_interval': 1,
+}
+# 在摄像头小窗口里画出手部和面部关键点（调试用）
+SHOW_LANDMARK_OVERLAY = False
+# 把两个玩家的头手轨迹录成 .npz（player1.npz、player2.npz），用 gesture_tuning.py 离线调阈值；None 为不录制
+RECORD_DIR = None
+# 识别结果和动作判断之间的关键点滤波：None（按时间窗口平均速度判断）、'one_euro' 或 'kalman'；
+# 开启后动作用滤波器的瞬时速度判断，几帧之内就能触发
+LANDMARK_FILTER = None
+LANDMARK_FILTER_OPTIONS = {}
+# 延迟补偿：按采集时间戳和滤波器的速度估计，把头部位置外推到这一帧预计显示的时间，
+# 抵消采集加识别的延迟（外推时长有上限，见 movement_analyzer.MAX_PREDICTION_HORIZON）。
+# 只在配置了 LANDMARK_FILTER 时生效：不滤波时的速度是整个时间窗口的平均值，太滞后，外推反而更偏
+LATENCY_COMPENSATION = True
+# 从计算位置到画面真正显示出来大约经过的时间（秒）
+DISPLAY_LATENCY = 1 / FPS
+# 渲染方式：'dirty' 只恢复和提交有变化的区域；'full' 每帧整屏重画（对比用）
+RENDER_MODE = 'dirty'
+# 摄像头小窗口的更新频率，不需要跟游戏一样 30 fps
+CAMERA_PREVIEW_FPS = 10
+# 固定模拟步长（秒）：StickMan 的计时器和重力按步计数，动作快慢不受渲染帧率和识别卡顿影响
+SIM_STEP = 1 / 30
+
+
+def follow_head(player, target_x):
+    """
+    一个模拟步：火柴人向头部映射出的目标横坐标靠近 30%
+    """
+    if target_x is None:
+        return
+    delta = abs(target_x - player.x)
+    player.x += 0.3 * (target_x - player.x)
+    player.x = max(50, min(WIDTH - 50, player.x))
+    player.is_moving = delta > 1
+
+
+def first_frame_shape(cap):
+    """
+    摄像头实际输出的帧形状 (高, 宽, 通道)；还没有任何帧时退回 CAP_PROP 报告的尺寸
+    """
+    ret, frame = cap.read()[:2]
+    if ret:
+        return frame.shape
+    return int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3
+
+
+def apply_gestures(player, gestures):
+    """
+    一个模拟步：按锁存的动作位掩码触发跳跃、出拳、防御
+    """
+    if gestures & GESTURE_JUMP:
+        player.jump()
+    if gestures & GESTURE_ATTACK_LEFT:
+        player.attack_left()
+    if gestures & GESTURE_ATTACK_RIGHT:
+        player.attack_right()
+    if gestures & GESTURE_DEFEND:
+        player.defend()
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Stickman Dual Camera Battle")
+
+    # 静态背景：底色、地面和血条边框只画一次，血条只在血量变化时重新渲染
+    hud = HUD(WIDTH, HEIGHT, 550, (RED, BLUE))
+    renderer = DirtyRectRenderer(screen, hud.background, full_redraw=RENDER_MODE == 'full')
+
+    clock = pygame.time.Clock()
+
+    player1 = StickMan(300, 550, RED)  # 修正初始地面高度为 650（避免卡在“虚假地面”）
+    player2 = StickMan(900, 550, BLUE, flip=True)
+
+    winner = None
+    game_over = False
+
+    # === 双摄像头 ===
+    cap1 = ThreadedCapture(0).start()  # 控制 player1
+    cap2 = ThreadedCapture(1).start()  # 控制 player2
+
+    # 识别进程（共享内存）和采集线程在循环出异常时也要停掉
+    perception1 = perception2 = None
+    try:
+        # 帧尺寸按实际收到的第一帧取（start() 已经等到了第一帧）：有些采集后端报告的
+        # CAP_PROP_FRAME_WIDTH/HEIGHT 是 0 或者和真正的帧不一致
+        cam1_shape = first_frame_shape(cap1)
+        cam2_shape = first_frame_shape(cap2)
+        # 摄像头图像宽度（用于头部位置映射）
+        cam1_width = cam1_shape[1]
+        cam2_width = cam2_shape[1]
+
+        if PERCEPTION_MODE == 'workers':
+            # 识别进程各自持有 HandAndHeadControl，主进程只负责采集和渲染；共享内存按真实帧尺寸分配
+            perception1 = PerceptionWorker(cam1_shape, **PERCEPTION_OPTIONS).start()
+            perception2 = PerceptionWorker(cam2_shape, **PERCEPTION_OPTIONS).start()
+        elif PERCEPTION_MODE == 'async':
+            # 回调把结果写进最新结果槽位，游戏循环只管提交和取结果；
+            # 在这里才导入，默认的 'workers' 方式不需要 MediaPipe Tasks
+            from async_perception import AsyncHandAndHeadControl
+            perception1 = AsyncHandAndHeadControl(**PERCEPTION_OPTIONS)
+            perception2 = AsyncHandAndHeadControl(**PERCEPTION_OPTIONS)
+        else:
+            hand_and_head_control1 = HandAndHeadControl(**PERCEPTION_OPTIONS)
+            hand_and_head_control2 = HandAndHeadControl(**PERCEPTION_OPTIONS)
+        landmark_overlay1 = LandmarkOverlay()
+        landmark_overlay2 = LandmarkOverlay()
+        camera_preview1 = CameraPreview((200, 150), CAMERA_PREVIEW_FPS)
+        camera_preview2 = CameraPreview((200, 150), CAMERA_PREVIEW_FPS)
+
+        # === Player 1 动作窗口（按时间窗口判断，和帧率无关）===
+        motion1 = StreamingMovementAnalyzer(landmark_filter=LANDMARK_FILTER, filter_options=LANDMARK_FILTER_OPTIONS)
+
+        # === Player 2 动作窗口（按时间窗口判断，和帧率无关）===
+        motion2 = StreamingMovementAnalyzer(landmark_filter=LANDMARK_FILTER, filter_options=LANDMARK_FILTER_OPTIONS)
+
+        if RECORD_DIR:
+            recorder1 = TrajectoryRecorder()
+            recorder2 = TrajectoryRecorder()
+
+        timestep = FixedTimestep(SIM_STEP)
+        # 每帧判断出的动作锁存到模拟步上，由下一个模拟步取走
+        latch1 = InputLatch()
+        latch2 = InputLatch()
+        # 头部映射出的目标横坐标，识别没有新结果时保持上一次的目标
+        target_x1 = target_x2 = None
+
+        running = True
+        while running:
+            # 后台线程采集，两个摄像头加起来最多等待一帧的时间（第二个只等剩下的部分）
+            deadline = time.perf_counter() + 1 / FPS
+            ret1, frame1, capture_time1, fresh1 = cap1.read(timeout=1 / FPS)
+            ret2, frame2, capture_time2, fresh2 = cap2.read(timeout=max(0.0, deadline - time.perf_counter()))
+
+            if not ret1 or not ret2:
+                print("⚠️ 摄像头读取失败，跳过此帧")
+                continue
+
+            frame1 = cv2.flip(frame1, 1)  
+            frame2 = cv2.flip(frame2, 1)
+            #cv2.imshow("Camera 1", frame1)
+            #cv2.imshow("Camera 2", frame2)
+
+            # === 识别：只提交新帧，等待超时拿到的上一帧不重复识别 ===
+            if PERCEPTION_MODE in ('workers', 'async'):
+                if fresh1:
+                    perception1.submit(frame1, capture_time1)
+                if fresh2:
+                    perception2.submit(frame2, capture_time2)
+                result1 = perception1.poll()
+                result2 = perception2.poll()
+            else:
+                result1 = hand_and_head_control1.process(frame1, capture_time1) if fresh1 else None
+                result2 = hand_and_head_control2.process(frame2, capture_time2) if fresh2 else None
+
+            # 没有新的识别结果时本帧不更新序列
+            hands1, head1 = (result1.hands, result1.head) if result1 else (NO_HANDS, None)
+            hands2, head2 = (result2.hands, result2.head) if result2 else (NO_HANDS, None)
+
+            if SHOW_LANDMARK_OVERLAY:
+                if result1:
+                    frame1 = landmark_overlay1.draw(frame1, result1)
+                if result2:
+                    frame2 = landmark_overlay2.draw(frame2, result2)
+
+            # === Player 1 识别 ===
+            if result1:
+                motion1.push(head1, hands1['left'], hands1['right'], result1.capture_time)
+                if RECORD_DIR:
+                    recorder1.add(result1.capture_time, head1, hands1['left'], hands1['right'])
+
+            # === Player 2 识别 ===
+            if result2:
+                motion2.push(head2, hands2['left'], hands2['right'], result2.capture_time)
+                if RECORD_DIR:
+                    recorder2.add(result2.capture_time, head2, hands2['left'], hands2['right'])
+
+            renderer.begin()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
-                    break
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_q:
-                        running = False
-                        break
-                    elif event.key == pygame.K_r:
-                        # 标记重新开始
-                        restart_requested = True
+
+            # === 延迟补偿：没有新结果的帧也按速度继续外推；最新一次识别没检测到头部时不外推，保持上一次的目标 ===
+            if LATENCY_COMPENSATION and LANDMARK_FILTER:
+                display_time = time.perf_counter() + DISPLAY_LATENCY
+                head1 = motion1.predict(display_time)[0]
+                head2 = motion2.predict(display_time)[0]
+
+            # === 用头部控制横向位置（目标在这里更新，靠近目标在模拟步里做）===
+            if head1 and cam1_width:
+                target_x1 = int(head1[0] / cam1_width * WIDTH)
+            if head2 and cam2_width:
+                target_x2 = int(head2[0] / cam2_width * WIDTH)
+
+            # 两个玩家的动作一次算完（头部窗口没填满时为 0），锁存到接下来的模拟步
+            gestures1, gestures2 = classify([motion1, motion2])
+            latch1.push(gestures1)
+            latch2.push(gestures2)
+
+            # === 固定步长模拟：按实际经过的时间跑 0 到若干步，动作在步里生效 ===
+            for _ in range(timestep.advance()):
+                apply_gestures(player1, latch1.pop())
+                apply_gestures(player2, latch2.pop())
+                follow_head(player1, target_x1)
+                follow_head(player2, target_x2)
+
+                # 边界限制
+                player1.x = max(50, min(player1.x, WIDTH - 50))
+                player2.x = max(50, min(player2.x, WIDTH - 50))
+
+                player1.update(player2)
+                player2.update(player1)
+                player1.check_hit(player2)
+                player2.check_hit(player1)
+
+            # 判断胜负
+            if player1.health <= 0:
+                winner = "Player 2"
+                game_over = True
+            elif player2.health <= 0:
+                winner = "Player 1"
+                game_over = True
+
+
+            # UI（地面和血条边框在背景里）
+            for rect in hud.draw_health_bars(screen, player1.health, player2.health):
+                renderer.add(rect)
+
+            # 在最近两个模拟状态之间插值
+            alpha = timestep.alpha
+            renderer.add(player1.draw(screen, alpha))
+            renderer.add(player2.draw(screen, alpha))
+
+            # === 摄像头画面嵌入为两个小窗口（按 CAMERA_PREVIEW_FPS 更新，其余帧沿用上一张）===
+            camera_preview1.update(frame1)
+            camera_preview2.update(frame2)
+            renderer.add(camera_preview1.draw(screen, (20, HEIGHT - 170)))
+            renderer.add(camera_preview2.draw(screen, (WIDTH - 220, HEIGHT - 170)))
+
+            # 显示胜利结算画面
+            if game_over:
+                screen.fill(WHITE)
+
+                # 胜者文字
+                text = hud.text(f"{winner} Wins!", 72, (0, 128, 0))
+                screen.blit(text, ((WIDTH - text.get_width()) // 2, HEIGHT // 2 - 100))
+
+                # 重新开始
+                restart_text = hud.text("Press R to Restart", 36, BLACK)
+                screen.blit(restart_text, ((WIDTH - restart_text.get_width()) // 2, HEIGHT // 2))
+
+                # 退出游戏
+                quit_text = hud.text("Press Q to Quit", 36, BLACK)
+                screen.blit(quit_text, ((WIDTH - quit_text.get_width()) // 2, HEIGHT // 2 + 50))
+
+                pygame.display.flip()
+
+                restart_requested = False
+
+                while True:
+                    for event in pygame.event.get():
+                        if event.type == pygame.QUIT:
+                            running = False
+                            break
+                        elif event.type == pygame.KEYDOWN:
+                            if event.key == pygame.K_q:
+                                running = False
+                                break
+                            elif event.key == pygame.K_r:
+                                # 标记重新开始
+                                restart_requested = True
+                                break
+                    if not running or restart_requested:
                         break
-            if not running or restart_requested:
-                break
-
-        if not running:
-            break  # 退出整个主循环
-        elif restart_requested:
-            # 执行重置
-            player1 = StickMan(300, 550, RED)
-            player2 = StickMan(900, 550, BLUE, flip=True)
-            left_hand_seq1.clear()
-            right_hand_seq1.clear()
-            head_seq1.clear()
-            left_hand_seq2.clear()
-            right_hand_seq2.clear()
-            head_seq2.clear()
-            winner = None
-            game_over = False
-            continue  # 跳过这帧，重新读取摄像头
-
-
-    
-    pygame.display.flip()
-    clock.tick(FPS)
-
-cap1.release()
-cap2.release()
-cv2.destroyAllWindows()
-pygame.quit()
-sys.exit()
+
+                if not running:
+                    break  # 退出整个主循环
+                elif restart_requested:
+                    # 执行重置
+                    player1 = StickMan(300, 550, RED)
+                    player2 = StickMan(900, 550, BLUE, flip=True)
+                    motion1.clear()
+                    motion2.clear()
+                    winner = None
+                    game_over = False
+                    target_x1 = target_x2 = None
+                    latch1.clear()
+                    latch2.clear()
+                    timestep.reset()  # 结算画面停留的时间不补跑
+                    renderer.invalidate()  # 结算画面整屏改写过
+                    continue  # 跳过这帧，重新读取摄像头
+
+
+
+            renderer.present()
+            clock.tick(FPS)
+    finally:
+        for perception in (perception1, perception2):
+            if perception is not None:
+                perception.stop()
+        cap1.release()
+        cap2.release()
+
+    if RECORD_DIR:
+        os.makedirs(RECORD_DIR, exist_ok=True)
+        recorder1.save(os.path.join(RECORD_DIR, "player1.npz"))
+        recorder2.save(os.path.join(RECORD_DIR, "player2.npz"))
+    cv2.destroyAllWindows()
+    pygame.quit()
+    sys.exit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,48 @@
 # logic.py
 
+import copy
+import time
 from math import sqrt
 from collections import deque
 
+import numpy as np
+
+from track_sequence import TrackSequence
+from landmark_filter import LandmarkFilter, create_filter
+
+# 按帧数窗口判断时的阈值（像素，窗口首尾的位移），MovementAnalyzer 使用
+JUMP_THRESHOLD = -30    # 头部 y 方向位移小于它算跳跃
+MOVE_THRESHOLD = 5      # 头部 x 方向位移超过它算移动
+ATTACK_THRESHOLD = 50   # 手部 x 方向位移超过它算出拳
+
+# 按时间窗口判断（秒），30 fps 下相当于原来的 30 帧头部窗口和 15 帧手部窗口
+HEAD_WINDOW = 1.0
+HAND_WINDOW = 0.5
+# 速度阈值（像素/秒，窗口首尾的平均速度），由上面的位移阈值除以窗口时长得到，和帧率无关
+JUMP_SPEED = JUMP_THRESHOLD / HEAD_WINDOW
+MOVE_SPEED = MOVE_THRESHOLD / HEAD_WINDOW
+ATTACK_SPEED = ATTACK_THRESHOLD / HAND_WINDOW
+# 用滤波器的瞬时速度判断时的阈值（像素/秒）。瞬时速度比窗口平均速度抖得多，
+# 阈值要明显高于静止时滤波后的速度噪声（默认参数下中心点抖动 3 像素时约 ±80 像素/秒）
+FILTERED_JUMP_SPEED = -150
+FILTERED_MOVE_SPEED = 100
+FILTERED_ATTACK_SPEED = 300
+# 用滤波器判断时的预热时长（秒）：滤波器几帧就能给出速度，不必等头部轨迹覆盖整个窗口
+FILTER_WARMUP = 0.1
+# 延迟补偿时最多向前外推的时长（秒），避免速度估计的误差被放大
+MAX_PREDICTION_HORIZON = 0.15
+# 轨迹缓冲区按这个最高帧率分配，帧率更低时窗口里的样本更少，判断结果不变
+MAX_FPS = 60
+
+# classify() 返回的位掩码
+GESTURE_JUMP = 1 << 0
+GESTURE_MOVE_LEFT = 1 << 1
+GESTURE_MOVE_RIGHT = 1 << 2
+GESTURE_ATTACK_LEFT = 1 << 3
+GESTURE_ATTACK_RIGHT = 1 << 4
+GESTURE_DEFEND = 1 << 5
+
+
 class MovementAnalyzer:
     def __init__(self):
         pass
@@ -16,35 +56,37 @@ class MovementAnalyzer:
         return sequence
 
     def moving_dis(self, sequence, index, target):
+        """
+        :param sequence: list、deque 或 TrackSequence
+        """
         col = 0 if target=="x" else 1
 
-        
-        sequence = self._prepare_sequence(sequence)
+        # deque 和 TrackSequence 本身支持下标访问，不需要先拷贝成 list
         length = len(sequence)
         return sequence[index][col] - sequence[index - length + 1][col]
     
     def is_jumping(self, sequence, index):
-        if self.moving_dis(sequence, index, "y") < -30:
+        if self.moving_dis(sequence, index, "y") < JUMP_THRESHOLD:
             return True
         return False
     
     def is_moving_left(self, sequence, index):
-        if self.moving_dis(sequence, index, "x") < -5:
+        if self.moving_dis(sequence, index, "x") < -MOVE_THRESHOLD:
             return True
         return False
     
     def is_moving_right(self, sequence, index):
-        if self.moving_dis(sequence, index, "x") > 5:
+        if self.moving_dis(sequence, index, "x") > MOVE_THRESHOLD:
             return True
         return False
     
     def is_attacking_right(self, sequence, index):
-        if self.moving_dis(sequence, index, "x") > 50:
+        if self.moving_dis(sequence, index, "x") > ATTACK_THRESHOLD:
             return True
         return False
     
     def is_attacking_left(self, sequence, index):
-        if self.moving_dis(sequence, index, "x") < -50:
+        if self.moving_dis(sequence, index, "x") < -ATTACK_THRESHOLD:
             return True
         return False
     
@@ -53,3 +95,209 @@ class MovementAnalyzer:
             return True
         return False
 
+
+def track_capacity(window, max_fps=MAX_FPS):
+    """
+    在 max_fps 下装下 window 秒轨迹所需的样本数
+    """
+    return int(np.ceil(window * max_fps)) + 1
+
+
+class StreamingMovementAnalyzer:
+    """
+    有状态的流式动作分析：每个玩家一个实例，每帧把头和双手的位置 push 一次，
+    各个动作按时间窗口内的平均速度判断，不再拷贝序列，也不依赖帧率。
+
+    指定 landmark_filter 时，每条轨迹先经过滤波再记录，动作改用滤波器的瞬时速度估计判断，
+    不必等平均速度在整个窗口里累积起来，动作几帧之内就能触发
+    """
+
+    def __init__(self, hand_window=HAND_WINDOW, head_window=HEAD_WINDOW, max_fps=MAX_FPS,
+                 landmark_filter=None, filter_options=None):
+        """
+        :param hand_window: 手部动作的时间窗口（秒）
+        :param head_window: 头部动作的时间窗口（秒）
+        :param max_fps: 缓冲区按这个帧率分配
+        :param landmark_filter: landmark_filter.FILTERS 里的名字（'one_euro'、'kalman'）、LandmarkFilter 实例，
+                                或 None（不滤波）。传实例时它只是模板，头和双手各用一份独立的拷贝
+        :param filter_options: 传给滤波器的参数
+        """
+        self.hand_window = hand_window
+        self.head_window = head_window
+        # 头部轨迹覆盖这么长时间后才开始判断动作
+        self.warmup = head_window if landmark_filter is None else FILTER_WARMUP
+        self.head = TrackSequence(track_capacity(head_window, max_fps))
+        self.left_hand = TrackSequence(track_capacity(hand_window, max_fps))
+        self.right_hand = TrackSequence(track_capacity(hand_window, max_fps))
+
+        # 头、左手、右手各一个滤波器
+        self.filters = None
+        if isinstance(landmark_filter, LandmarkFilter):
+            self.filters = tuple(copy.deepcopy(landmark_filter) for _ in range(3))
+            for track_filter in self.filters:
+                track_filter.reset()
+        elif landmark_filter is not None:
+            options = filter_options or {}
+            self.filters = tuple(create_filter(landmark_filter, **options) for _ in range(3))
+
+    def push(self, head=None, left_hand=None, right_hand=None, t=None):
+        """
+        记录一帧的识别结果，没检测到的部位传 None（记为无效帧，坐标沿用上一个有效点）
+        :param t: 帧的采集时间戳
+        """
+        if self.filters is not None:
+            if t is None:
+                t = time.perf_counter()
+            head_filter, left_filter, right_filter = self.filters
+            head = head_filter.update(head, t)
+            left_hand = left_filter.update(left_hand, t)
+            right_hand = right_filter.update(right_hand, t)
+        self.head.append(head, t)
+        self.left_hand.append(left_hand, t)
+        self.right_hand.append(right_hand, t)
+
+    def ready(self):
+        """
+        头部轨迹已经覆盖预热时长（不滤波时为整个时间窗口），可以开始判断动作
+        """
+        return self.head.covers(self.warmup)
+
+    def clear(self):
+        self.head.clear()
+        self.left_hand.clear()
+        self.right_hand.clear()
+        if self.filters is not None:
+            for landmark_filter in self.filters:
+                landmark_filter.reset()
+
+    def velocities(self):
+        """
+        头、左手、右手的速度 (vx, vy)，像素/秒：有滤波器时取滤波器的估计，否则取时间窗口内的平均速度
+        """
+        if self.filters is not None:
+            return tuple(landmark_filter.velocity for landmark_filter in self.filters)
+        return (self.head.velocity(self.head_window), self.left_hand.velocity(self.hand_window),
+                self.right_hand.velocity(self.hand_window))
+
+    def predict(self, t, max_horizon=MAX_PREDICTION_HORIZON):
+        """
+        按最新的有效点和速度估计，把头和双手的位置外推到 t 时刻（例如这一帧预计显示的时间），
+        用来抵消采集加识别的延迟。有滤波器时速度更准，外推效果更好
+        :param t: 目标时间（time.perf_counter 秒）
+        :param max_horizon: 最多外推的秒数
+        :return: (头, 左手, 右手)，每个为 (x, y)；还没有有效点，或最新一次识别没检测到的部位为 None，
+                 不再拿上一个有效点按旧的速度外推
+        """
+        predicted = []
+        for track, (vx, vy) in zip((self.head, self.left_hand, self.right_hand), self.velocities()):
+            point = track.latest()
+            if point is None or not track.window(1)[2][-1]:
+                predicted.append(None)
+                continue
+            dt = min(max(t - track.latest_time(), 0.0), max_horizon)
+            predicted.append((point[0] + vx * dt, point[1] + vy * dt))
+        return tuple(predicted)
+
+    def speed_thresholds(self):
+        """
+        :return: 与 velocities() 对应的 (跳跃, 移动, 出拳) 速度阈值
+        """
+        if self.filters is not None:
+            return FILTERED_JUMP_SPEED, FILTERED_MOVE_SPEED, FILTERED_ATTACK_SPEED
+        return JUMP_SPEED, MOVE_SPEED, ATTACK_SPEED
+
+    def is_jumping(self):
+        return self.velocities()[0][1] < self.speed_thresholds()[0]
+
+    def is_moving_left(self):
+        return self.velocities()[0][0] < -self.speed_thresholds()[1]
+
+    def is_moving_right(self):
+        return self.velocities()[0][0] > self.speed_thresholds()[1]
+
+    def is_attacking_right(self):
+        return self.velocities()[2][0] > self.speed_thresholds()[2]
+
+    def is_attacking_left(self):
+        return self.velocities()[1][0] < -self.speed_thresholds()[2]
+
+    def is_defending(self):
+        left, right, head = self.left_hand.latest(), self.right_hand.latest(), self.head.latest()
+        if left is None or right is None or head is None:
+            return False
+        return left[0] > right[0] and head[1] > (left[1] + right[1]) / 2
+
+    def classify(self):
+        """
+        一次算出这个玩家的所有动作，返回位掩码（见 classify()）
+        """
+        return int(classify([self])[0])
+
+
+def _player_tracks(player):
+    """
+    :return: (头, 左手, 右手, 开始判断前头部轨迹要覆盖的时长)；字典形式的玩家使用默认窗口
+    """
+    if isinstance(player, StreamingMovementAnalyzer):
+        return player.head, player.left_hand, player.right_hand, player.warmup
+    return player['head'], player['left'], player['right'], HEAD_WINDOW
+
+
+def _player_velocities(player):
+    """
+    :return: (头、左手、右手的速度, 对应的速度阈值)
+    """
+    if isinstance(player, StreamingMovementAnalyzer):
+        return player.velocities(), player.speed_thresholds()
+    return ((player['head'].velocity(HEAD_WINDOW), player['left'].velocity(HAND_WINDOW),
+             player['right'].velocity(HAND_WINDOW)), (JUMP_SPEED, MOVE_SPEED, ATTACK_SPEED))
+
+
+def _latest_or_nan(track):
+    point = track.latest()
+    return (np.nan, np.nan) if point is None else point
+
+
+def _player_features(player):
+    """
+    一个玩家的窗口特征，每个只算一次：
+    头部 vx、vy，左右手 vx，左右手和头部的最新坐标，头部轨迹是否已覆盖预热时长，
+    以及这个玩家的跳跃、移动、出拳速度阈值
+    """
+    head, left, right, warmup = _player_tracks(player)
+    ((head_vx, head_vy), (left_vx, _), (right_vx, _)), speeds = _player_velocities(player)
+    left_x, left_y = _latest_or_nan(left)
+    right_x, right_y = _latest_or_nan(right)
+    head_y = _latest_or_nan(head)[1]
+    return (head_vx, head_vy, left_vx, right_vx, left_x, left_y, right_x, right_y, head_y,
+            float(head.covers(warmup))) + tuple(speeds)
+
+
+def classify(players):
+    """
+    一次调用判断所有玩家的所有动作：窗口特征只算一次，阈值判断对所有玩家向量化进行
+    :param players: StreamingMovementAnalyzer，或 {'head', 'left', 'right'} 的 TrackSequence 字典；
+                    可以是单个玩家，也可以是多个玩家的列表
+    :return: 单个玩家时返回 int 位掩码，列表时返回每个玩家的位掩码数组（GESTURE_* 的组合）。
+             头部轨迹还没覆盖预热时长（不滤波时为时间窗口）的玩家结果为 0
+    """
+    single = not isinstance(players, (list, tuple))
+    if single:
+        players = [players]
+
+    features = np.array([_player_features(player) for player in players], dtype=np.float64).reshape(-1, 13)
+    (head_vx, head_vy, left_vx, right_vx, left_x, left_y, right_x, right_y, head_y, ready,
+     jump_speed, move_speed, attack_speed) = features.T
+
+    # 与 NaN（还没有有效点）比较的结果都是 False
+    masks = ((head_vy < jump_speed) * GESTURE_JUMP
+             | (head_vx < -move_speed) * GESTURE_MOVE_LEFT
+             | (head_vx > move_speed) * GESTURE_MOVE_RIGHT
+             | (left_vx < -attack_speed) * GESTURE_ATTACK_LEFT
+             | (right_vx > attack_speed) * GESTURE_ATTACK_RIGHT
+             | ((left_x > right_x) & (head_y > (left_y + right_y) / 2)) * GESTURE_DEFEND)
+    masks = np.where(ready > 0, masks, 0).astype(np.int32)
+
+    if single:
+        return int(masks[0])
+    return masks
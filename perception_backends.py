@@ -0,0 +1,186 @@
+# perception_backends.py
+import mediapipe as mp
+import numpy as np
+
+# Pose 模型里用来估计头部和手部中心的关键点编号
+POSE_FACE_POINTS = list(range(0, 11))     # 鼻子、眼睛、耳朵、嘴角
+POSE_LEFT_HAND_POINTS = [15, 17, 19, 21]  # 左手腕、小指、食指、拇指
+POSE_RIGHT_HAND_POINTS = [16, 18, 20, 22]
+
+
+def landmarks_to_array(landmark_list):
+    """
+    把 MediaPipe 的关键点列表一次性转成 (N, 3) 的 float32 数组
+    :param landmark_list: solutions 接口的 NormalizedLandmarkList，或 Tasks 接口返回的关键点列表
+    :return: 每行 (x, y, z)，都是相对于输入图像的归一化坐标
+    """
+    landmarks = getattr(landmark_list, 'landmark', landmark_list)
+    return np.fromiter((v for lm in landmarks for v in (lm.x, lm.y, lm.z)),
+                       dtype=np.float32, count=3 * len(landmarks)).reshape(-1, 3)
+
+
+class PerceptionBackend:
+    """
+    识别后端的接口。HandAndHeadControl 负责裁剪、缩放、坐标映射和分频调度，后端只负责推理。
+
+    outputs: {模型名: 该模型能给出的结果}，结果是 'hands' 和/或 'face'
+    detect(rgb, models): 运行 models 里列出的模型，返回 {'hands': {...}, 'face': ...}，
+        只包含本次实际运行得到的结果。手部为 {'left': 数组或 None, 'right': 数组或 None}，
+        面部为数组或 None，数组都是 (N, 3) 的归一化坐标，中心取所有点的平均值。
+        左右手的约定与 MediaPipe Hands 一致：假设输入是镜像画面。
+    """
+    outputs = {}
+
+    def detect(self, rgb, models):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class HandsFaceMeshBackend(PerceptionBackend):
+    """
+    默认后端：Hands 给出每只手 21 个点，FaceMesh 给出 468 个面部点
+    """
+    outputs = {'hands': ('hands',), 'face': ('face',)}
+
+    def __init__(self, min_detection_confidence=0.8, min_tracking_confidence=0.8):
+        # 初始化手部识别
+        self.mp_hands = mp.solutions.hands
+        self.hands = self.mp_hands.Hands(min_detection_confidence=min_detection_confidence,
+                                         min_tracking_confidence=min_tracking_confidence)
+
+        # 初始化面部识别
+        self.mp_face_mesh = mp.solutions.face_mesh
+        self.face_mesh = self.mp_face_mesh.FaceMesh(min_detection_confidence=min_detection_confidence,
+                                                    min_tracking_confidence=min_tracking_confidence)
+
+    def detect(self, rgb, models):
+        out = {}
+        if 'hands' in models:
+            out['hands'] = detect_hands(self.hands, rgb)
+        if 'face' in models:
+            results = self.face_mesh.process(rgb)
+            out['face'] = landmarks_to_array(results.multi_face_landmarks[0]) if results.multi_face_landmarks else None
+        return out
+
+    def close(self):
+        self.hands.close()
+        self.face_mesh.close()
+
+
+class FaceDetectionBackend(PerceptionBackend):
+    """
+    头部用人脸检测框的中心代替 468 点的 FaceMesh，手部仍用 Hands
+    """
+    outputs = {'hands': ('hands',), 'face': ('face',)}
+
+    def __init__(self, min_detection_confidence=0.8, min_tracking_confidence=0.8, model_selection=0):
+        """
+        :param model_selection: 0 为 2 米内的近距离模型，1 为 5 米内的远距离模型
+        """
+        self.mp_hands = mp.solutions.hands
+        self.hands = self.mp_hands.Hands(min_detection_confidence=min_detection_confidence,
+                                         min_tracking_confidence=min_tracking_confidence)
+
+        self.mp_face_detection = mp.solutions.face_detection
+        self.face_detection = self.mp_face_detection.FaceDetection(
+            min_detection_confidence=min_detection_confidence, model_selection=model_selection)
+
+    def detect(self, rgb, models):
+        out = {}
+        if 'hands' in models:
+            out['hands'] = detect_hands(self.hands, rgb)
+        if 'face' in models:
+            results = self.face_detection.process(rgb)
+            face = None
+            if results.detections:
+                # 取置信度最高的人脸，用检测框的两个角点表示，平均值就是框的中心
+                detection = max(results.detections, key=lambda d: d.score[0])
+                box = detection.location_data.relative_bounding_box
+                face = np.array([[box.xmin, box.ymin, 0.0],
+                                 [box.xmin + box.width, box.ymin + box.height, 0.0]], dtype=np.float32)
+            out['face'] = face
+        return out
+
+    def close(self):
+        self.hands.close()
+        self.face_detection.close()
+
+
+class PoseBackend(PerceptionBackend):
+    """
+    单模型后端：一次 Pose 推理同时给出头部（面部 11 个点）和双手（手腕及手指根部 4 个点）
+    """
+    outputs = {'pose': ('hands', 'face')}
+
+    def __init__(self, min_detection_confidence=0.8, min_tracking_confidence=0.8, model_complexity=0,
+                 min_visibility=0.5):
+        """
+        :param model_complexity: 0 为 lite 模型，速度最快
+        :param min_visibility: 关键点可见度低于这个值时当作没检测到
+        """
+        self.mp_pose = mp.solutions.pose
+        self.pose = self.mp_pose.Pose(model_complexity=model_complexity,
+                                      min_detection_confidence=min_detection_confidence,
+                                      min_tracking_confidence=min_tracking_confidence)
+        self.min_visibility = min_visibility
+
+    def _select(self, points, visibility, indices):
+        if visibility[indices].min() < self.min_visibility:
+            return None
+        return points[indices]
+
+    def detect(self, rgb, models):
+        if 'pose' not in models:
+            return {}
+        results = self.pose.process(rgb)
+        if not results.pose_landmarks:
+            return {'hands': {'left': None, 'right': None}, 'face': None}
+
+        landmarks = results.pose_landmarks.landmark
+        points = landmarks_to_array(results.pose_landmarks)
+        visibility = np.fromiter((lm.visibility for lm in landmarks), dtype=np.float32, count=len(landmarks))
+        # Pose 按画面里人的朝向区分左右，镜像画面里正好和 Hands 的约定相反
+        hands = {'left': self._select(points, visibility, POSE_RIGHT_HAND_POINTS),
+                 'right': self._select(points, visibility, POSE_LEFT_HAND_POINTS)}
+        return {'hands': hands, 'face': self._select(points, visibility, POSE_FACE_POINTS)}
+
+    def close(self):
+        self.pose.close()
+
+
+def detect_hands(hands_model, rgb):
+    """
+    运行 MediaPipe Hands，按左右手返回归一化关键点数组
+    """
+    hands = {'left': None, 'right': None}
+    results = hands_model.process(rgb)
+    if results.multi_hand_landmarks:
+        for idx, landmark_list in enumerate(results.multi_hand_landmarks):
+            hand_type = results.multi_handedness[idx].classification[0].label  # 获取是左手还是右手
+            if hand_type == 'Left':
+                hands['left'] = landmarks_to_array(landmark_list)
+            elif hand_type == 'Right':
+                hands['right'] = landmarks_to_array(landmark_list)
+    return hands
+
+
+BACKENDS = {
+    'hands_face_mesh': HandsFaceMeshBackend,
+    'face_detection': FaceDetectionBackend,
+    'pose': PoseBackend,
+}
+
+
+def create_backend(backend=None, **kwargs):
+    """
+    :param backend: BACKENDS 里的名字、PerceptionBackend 实例，或 None（默认 Hands + FaceMesh）
+    """
+    if backend is None:
+        backend = 'hands_face_mesh'
+    if isinstance(backend, PerceptionBackend):
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError(f"未知的识别后端: {backend}，可选: {', '.join(BACKENDS)}")
+    return BACKENDS[backend](**kwargs)
@@ -0,0 +1,131 @@
+# perception_worker.py
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from head_and_hand import HandAndHeadControl, PerceptionResult
+
+# 共享状态数组里的下标
+_LATEST = 0  # 最新发布、还没被 worker 取走的槽位，-1 表示没有
+_BUSY = 1    # worker 正在识别的槽位，-1 表示空闲
+
+
+def _worker_main(shm_name, frame_shape, lock, state, capture_time, frame_ready, stop_event, conn, control_kwargs):
+    """
+    worker 进程入口：独占一个 HandAndHeadControl，从共享内存读帧，只把坐标和关键点数组发回主进程
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    slots = np.ndarray((2,) + tuple(frame_shape), dtype=np.uint8, buffer=shm.buf)
+    control = HandAndHeadControl(**control_kwargs)
+
+    try:
+        while not stop_event.is_set():
+            if not frame_ready.wait(0.1):
+                continue
+            with lock:
+                frame_ready.clear()
+                slot = state[_LATEST]
+                if slot < 0:
+                    continue
+                state[_BUSY] = slot
+                state[_LATEST] = -1
+                frame_time = capture_time.value
+
+            # 直接在共享内存上识别，不拷贝、不 pickle 整帧
+            result = control.process(slots[slot], frame_time)
+
+            with lock:
+                state[_BUSY] = -1
+            conn.send((result.hands, result.head, result.capture_time, result.process_time,
+                       result.hand_landmarks, result.face_landmarks, result.roi, result.measured))
+    finally:
+        del slots
+        shm.close()
+        conn.close()
+
+
+class PerceptionWorker:
+    """
+    每个摄像头一个识别进程。
+    主进程把帧写进共享内存的双缓冲槽位，worker 识别后只返回手和头的坐标，
+    这样两路摄像头的 MediaPipe 推理可以分别跑在不同的 CPU 核上。
+    """
+
+    def __init__(self, frame_shape, **control_kwargs):
+        """
+        :param frame_shape: 帧的形状 (height, width, 3)
+        :param control_kwargs: 传给 worker 内 HandAndHeadControl 的参数
+        """
+        self.frame_shape = tuple(int(v) for v in frame_shape)
+        self.control_kwargs = control_kwargs
+
+        ctx = mp.get_context("spawn")
+        frame_bytes = int(np.prod(self.frame_shape))
+        self._shm = shared_memory.SharedMemory(create=True, size=2 * frame_bytes)
+        self._slots = np.ndarray((2,) + self.frame_shape, dtype=np.uint8, buffer=self._shm.buf)
+
+        self._lock = ctx.Lock()
+        self._state = ctx.RawArray('i', [-1, -1])
+        self._capture_time = ctx.RawValue('d', 0.0)
+        self._frame_ready = ctx.Event()
+        self._stop_event = ctx.Event()
+        self._conn, child_conn = ctx.Pipe(duplex=False)
+
+        self._process = ctx.Process(
+            target=_worker_main,
+            args=(self._shm.name, self.frame_shape, self._lock, self._state, self._capture_time,
+                  self._frame_ready, self._stop_event, child_conn, control_kwargs),
+            daemon=True,
+        )
+
+    def start(self):
+        self._process.start()
+        return self
+
+    def submit(self, frame, capture_time=None):
+        """
+        把一帧写进共享内存交给 worker。worker 忙时新帧会覆盖还没被取走的旧帧
+        :param frame: BGR 图像帧，形状必须与 frame_shape 一致
+        :param capture_time: 帧的采集时间戳
+        """
+        if capture_time is None:
+            capture_time = time.perf_counter()
+
+        with self._lock:
+            # 选一个 worker 没在用的槽位；如果它是还没被取走的最新帧，先撤回再覆盖
+            slot = 1 if self._state[_BUSY] == 0 else 0
+            if self._state[_LATEST] == slot:
+                self._state[_LATEST] = -1
+
+        np.copyto(self._slots[slot], frame)
+
+        with self._lock:
+            self._state[_LATEST] = slot
+            self._capture_time.value = capture_time
+            self._frame_ready.set()
+
+    def poll(self):
+        """
+        取回最新的识别结果，不阻塞
+        :return: 自上次 poll 以来最新的 PerceptionResult，没有新结果时返回 None
+        """
+        latest = None
+        while self._conn.poll():
+            latest = self._conn.recv()
+        if latest is None:
+            return None
+        return PerceptionResult(*latest)
+
+    def stop(self):
+        self._stop_event.set()
+        self._frame_ready.set()
+        if self._process.is_alive():
+            self._process.join(timeout=2.0)
+            if self._process.is_alive():
+                self._process.terminate()
+        self._conn.close()
+        del self._slots
+        self._shm.close()
+        self._shm.unlink()
@@ -1,8 +1,83 @@
 # stickman.py
 import pygame
 import math
+from collections import OrderedDict
+
+
+class SpriteCache:
+    """
+    预渲染姿势精灵的 LRU 缓存：键是量化后的姿势参数，值是用颜色键抠掉背景的不透明 Surface。
+    总像素内存超过 max_bytes 时淘汰最久没用过的精灵
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._sprites = OrderedDict()  # key -> (surface, 原点 x, 原点 y, 字节数)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, render):
+        """
+        :param render: 缓存未命中时调用，返回 (surface, 原点 x, 原点 y)
+        :return: (surface, 原点 x, 原点 y)
+        """
+        entry = self._sprites.get(key)
+        if entry is not None:
+            self._sprites.move_to_end(key)
+            self.hits += 1
+            return entry[:3]
+
+        self.misses += 1
+        surface, origin_x, origin_y = render()
+        size = surface.get_width() * surface.get_height() * surface.get_bytesize()
+        self._sprites[key] = (surface, origin_x, origin_y, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes and len(self._sprites) > 1:
+            _, (_, _, _, evicted) = self._sprites.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+        return surface, origin_x, origin_y
+
+    def clear(self):
+        self._sprites.clear()
+        self.bytes = 0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self):
+        return len(self._sprites)
+
+
+# 可选的共用精灵缓存，赋给 StickMan.sprite_cache 后开启
+SPRITE_CACHE = SpriteCache()
+
+# 精灵的键里臂长按这个步长（像素）取整：出拳时臂长跟着对手距离连续变化，
+# 按整像素取整几乎每帧都是新姿势，分桶后同一段距离内的出拳共用精灵
+ARM_LENGTH_BUCKET = 10
+# 精灵背景的颜色键，和火柴人颜色相同时换用备用色
+COLORKEY = (255, 0, 255)
+COLORKEY_FALLBACK = (0, 255, 255)
+
+
+def _bucket(length):
+    return int(round(length / ARM_LENGTH_BUCKET)) * ARM_LENGTH_BUCKET
+
 
 class StickMan:
+    # 默认每帧直接用 pygame.draw 画：benchmark.py 里对战时姿势变化太多，缓存命中率低，
+    # 未命中时渲染精灵的开销比直接画还大；姿势基本不变的场景可以设为 SPRITE_CACHE
+    sprite_cache = None
+
     def __init__(self, x, y, color, flip=False):
         self.x = x
         self.y = y
@@ -36,7 +111,14 @@ class StickMan:
         self.facing_right = not flip
         self.animation_frame = 0
 
+        # 最近两个模拟步结束时的位置，固定步长模拟时渲染在两者之间插值
+        self._prev_position = (x, y)
+        self._position = (x, y)
+
     def update(self, other):
+        """
+        前进一个模拟步：所有计时器、重力和动画都按步计数
+        """
         self.animation_frame += 0.2
 
         if self.is_jumping:
@@ -88,6 +170,9 @@ class StickMan:
                 self.defense_timer = 0
                 self.head_scale = 1.0
 
+        self._prev_position = self._position
+        self._position = (self.x, self.y)
+
     def jump(self):
         if not self.is_jumping:
             self.is_jumping = True
@@ -114,58 +199,115 @@ class StickMan:
             if self.health < 0:
                 self.health = 0
 
-    def draw(self, screen):
-        head_radius = 15 * self.head_scale
+    def _pose(self):
+        """
+        画一帧需要的姿势参数：(头半径, 右臂长, 右拳半径, 左臂长, 左拳半径, 腿弯曲, 摆腿偏移)
+        """
+        head_radius = int(15 * self.head_scale)
+        right_radius = int(8 * self.punch_scale_right if self.attacking_right else 8)
+        left_radius = int(8 * self.punch_scale_left if self.attacking_left else 8)
+
+        base_bend = 10
+        animation_offset = math.sin(self.animation_frame) * 10 if self.is_moving and not self.is_jumping else 0
+
+        if self.is_jumping:
+            extra_bend = max(5, min(20, abs(self.jump_velocity) * 1.0))
+        else:
+            extra_bend = 0
+
+        total_bend = base_bend + extra_bend
+        return (head_radius, self.arm_length_right, right_radius, self.arm_length_left, left_radius,
+                total_bend, animation_offset)
+
+    def render_position(self, alpha=None):
+        """
+        :param alpha: 固定步长模拟的插值比例（FixedTimestep.alpha），None 表示直接用当前位置
+        """
+        if alpha is None:
+            return self.x, self.y
+        (x0, y0), (x1, y1) = self._prev_position, self._position
+        return x0 + (x1 - x0) * alpha, y0 + (y1 - y0) * alpha
+
+    def draw(self, screen, alpha=None):
+        """
+        :param alpha: 固定步长模拟时在上一步和这一步之间插值，见 render_position()
+        :return: 这一帧画过的区域（pygame.Rect），供脏矩形渲染使用
+        """
+        x, y = self.render_position(alpha)
+        pose = self._pose()
+        cache = self.sprite_cache
+        if cache is None:
+            return self._draw_pose(screen, x, y, pose)
+
+        # 长度按整像素量化、臂长按 ARM_LENGTH_BUCKET 分桶，同一个姿势的所有帧共用一张精灵
+        head_radius, arm_right, right_radius, arm_left, left_radius, total_bend, animation_offset = pose
+        key = (self.color, head_radius, _bucket(arm_right), right_radius, _bucket(arm_left), left_radius,
+               int(round(total_bend)), int(round(animation_offset)))
+        sprite, origin_x, origin_y = cache.get(key, lambda: self._render_sprite(key[1:]))
+        return screen.blit(sprite, (int(x) - origin_x, int(y) - origin_y))
+
+    def _render_sprite(self, pose):
+        """
+        把姿势画到刚好装得下的 Surface 上。背景填颜色键并开启 RLE 加速：
+        贴图时只拷贝火柴人本身的像素，比逐像素 alpha 混合的 SRCALPHA 精灵快得多
+        （线条不抗锯齿，没有半透明的边缘，颜色键抠图和直接画完全一样）
+        :return: (surface, 头部中心在 surface 里的 x, y)
+        """
+        head_radius, arm_right, right_radius, arm_left, left_radius, total_bend, animation_offset = pose
+        margin = 3
+        legs = total_bend + abs(animation_offset)
+        fist_bottom = head_radius + 15 + max(right_radius, left_radius)
+        left = max(arm_left + left_radius, head_radius, legs) + margin
+        right = max(arm_right + right_radius, head_radius, legs) + margin
+        top = head_radius + margin
+        bottom = max(120, fist_bottom) + margin
+
+        surface = pygame.Surface((left + right, top + bottom))
+        colorkey = COLORKEY if tuple(self.color[:3]) != COLORKEY else COLORKEY_FALLBACK
+        surface.fill(colorkey)
+        self._draw_pose(surface, left, top, pose)
+        surface.set_colorkey(colorkey, pygame.RLEACCEL)
+        return surface, left, top
+
+    def _draw_pose(self, screen, head_x, head_y, pose):
+        head_radius, arm_length_right, right_radius, arm_length_left, left_radius, total_bend, animation_offset = pose
         body_length = 60
-        leg_length = 50
 
-        head_x = self.x
-        head_y = self.y
-        arm_joint_y = head_y + int(head_radius) + 15
+        arm_joint_y = head_y + head_radius + 15
 
-        pygame.draw.circle(screen, self.color, (head_x, head_y), int(head_radius))
+        rects = [pygame.draw.circle(screen, self.color, (head_x, head_y), head_radius)]
         body_bottom_x = head_x
         body_bottom_y = head_y + body_length
-        pygame.draw.line(screen, self.color, (head_x, head_y + int(head_radius)),
-                         (body_bottom_x, body_bottom_y), 3)
+        rects.append(pygame.draw.line(screen, self.color, (head_x, head_y + head_radius),
+                                      (body_bottom_x, body_bottom_y), 3))
 
-        right_end_x = head_x + self.arm_length_right
+        right_end_x = head_x + arm_length_right
         right_end_y = arm_joint_y
-        right_radius = 8 * self.punch_scale_right if self.attacking_right else 8
-        pygame.draw.line(screen, self.color, (head_x, arm_joint_y), (right_end_x, right_end_y), 3)
-        pygame.draw.circle(screen, self.color, (int(right_end_x), int(right_end_y)), int(right_radius))
+        rects.append(pygame.draw.line(screen, self.color, (head_x, arm_joint_y), (right_end_x, right_end_y), 3))
+        rects.append(pygame.draw.circle(screen, self.color, (int(right_end_x), int(right_end_y)), right_radius))
 
-        left_end_x = head_x - self.arm_length_left
+        left_end_x = head_x - arm_length_left
         left_end_y = arm_joint_y
-        left_radius = 8 * self.punch_scale_left if self.attacking_left else 8
-        pygame.draw.line(screen, self.color, (head_x, arm_joint_y), (left_end_x, left_end_y), 3)
-        pygame.draw.circle(screen, self.color, (int(left_end_x), int(left_end_y)), int(left_radius))
+        rects.append(pygame.draw.line(screen, self.color, (head_x, arm_joint_y), (left_end_x, left_end_y), 3))
+        rects.append(pygame.draw.circle(screen, self.color, (int(left_end_x), int(left_end_y)), left_radius))
 
         thigh_length = 30
         calf_length = 30
-        base_bend = 10
-        animation_offset = math.sin(self.animation_frame) * 10 if self.is_moving and not self.is_jumping else 0
-
-        if self.is_jumping:
-            extra_bend = max(5, min(20, abs(self.jump_velocity) * 1.0))
-        else:
-            extra_bend = 0
-
-        total_bend = base_bend + extra_bend
 
         left_knee_x = body_bottom_x - total_bend + animation_offset
         left_knee_y = body_bottom_y + thigh_length
         left_foot_x = left_knee_x
         left_foot_y = left_knee_y + calf_length
-        pygame.draw.line(screen, self.color, (body_bottom_x, body_bottom_y), (left_knee_x, left_knee_y), 3)
-        pygame.draw.line(screen, self.color, (left_knee_x, left_knee_y), (left_foot_x, left_foot_y), 3)
+        rects.append(pygame.draw.line(screen, self.color, (body_bottom_x, body_bottom_y), (left_knee_x, left_knee_y), 3))
+        rects.append(pygame.draw.line(screen, self.color, (left_knee_x, left_knee_y), (left_foot_x, left_foot_y), 3))
 
         right_knee_x = body_bottom_x + total_bend - animation_offset
         right_knee_y = body_bottom_y + thigh_length
         right_foot_x = right_knee_x
         right_foot_y = right_knee_y + calf_length
-        pygame.draw.line(screen, self.color, (body_bottom_x, body_bottom_y), (right_knee_x, right_knee_y), 3)
-        pygame.draw.line(screen, self.color, (right_knee_x, right_knee_y), (right_foot_x, right_foot_y), 3)
+        rects.append(pygame.draw.line(screen, self.color, (body_bottom_x, body_bottom_y), (right_knee_x, right_knee_y), 3))
+        rects.append(pygame.draw.line(screen, self.color, (right_knee_x, right_knee_y), (right_foot_x, right_foot_y), 3))
+        return rects[0].unionall(rects[1:])
 
     def check_hit(self, other):
         arm_joint_y = self.y + 15 * self.head_scale + 15
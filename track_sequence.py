@@ -0,0 +1,145 @@
+# track_sequence.py
+import time
+
+import numpy as np
+
+
+class TrackSequence:
+    """
+    预分配的 NumPy 环形缓冲区，存放带时间戳的二维轨迹（头或手的中心坐标）。
+
+    每个样本同时写在位置 i 和 i + capacity 两处，所以最近的 capacity 个样本在数组里
+    总是连续的一段，points / times / valid 都是零拷贝的视图（从旧到新）。
+    没检测到的帧也占一个位置：valid 为 False，坐标沿用上一个有效点（还没有有效点时为 NaN）。
+    可以直接传给 MovementAnalyzer，下标用法和 deque 一样。
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._points = np.full((2 * capacity, 2), np.nan)
+        self._times = np.zeros(2 * capacity)
+        self._valid = np.zeros(2 * capacity, dtype=bool)
+        self._next = 0    # 下一个样本写入的位置，范围 [0, capacity)
+        self._count = 0
+        self._last_point = (np.nan, np.nan)
+        self._last_time = None
+
+    def append(self, point, t=None):
+        """
+        追加一帧
+        :param point: (x, y)，None 表示这一帧没有检测到
+        :param t: 采集时间戳（秒），默认取当前时间
+        """
+        if t is None:
+            t = time.perf_counter()
+        valid = point is not None
+        if valid:
+            self._last_point = point
+            self._last_time = t
+
+        i = self._next
+        j = i + self.capacity
+        self._points[i] = self._points[j] = self._last_point
+        self._times[i] = self._times[j] = t
+        self._valid[i] = self._valid[j] = valid
+
+        self._next = (i + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def clear(self):
+        """
+        清空轨迹，只重置计数，不释放也不清零缓冲区
+        """
+        self._next = 0
+        self._count = 0
+        self._last_point = (np.nan, np.nan)
+        self._last_time = None
+
+    def _span(self, n):
+        end = self._next + self.capacity
+        return end - n, end
+
+    def window(self, n=None):
+        """
+        最近 n 个样本的零拷贝视图
+        :return: (points (n, 2), times (n,), valid (n,))，从旧到新
+        """
+        n = self._count if n is None else min(n, self._count)
+        start, end = self._span(n)
+        return self._points[start:end], self._times[start:end], self._valid[start:end]
+
+    @property
+    def points(self):
+        return self.window()[0]
+
+    @property
+    def times(self):
+        return self.window()[1]
+
+    @property
+    def valid(self):
+        return self.window()[2]
+
+    def displacement(self, n=None):
+        """
+        最近 n 个样本首尾的位移 (dx, dy)，O(1)
+        """
+        n = self._count if n is None else min(n, self._count)
+        if n < 2:
+            return 0.0, 0.0
+        start, end = self._span(n)
+        dx, dy = self._points[end - 1] - self._points[start]
+        return dx, dy
+
+    def velocity(self, duration=None):
+        """
+        最近 duration 秒内首尾的平均速度 (vx, vy)，单位像素/秒。
+        按采集时间戳计算，同样的动作在 15、30、60 fps 下结果一样
+        :param duration: 时间窗口（秒），None 表示整个缓冲区
+        """
+        if self._count < 2:
+            return 0.0, 0.0
+        start, end = self._span(self._count)
+        if duration is not None:
+            # 时间戳单调递增，二分找到窗口内最早的样本
+            start += int(np.searchsorted(self._times[start:end], self._times[end - 1] - duration))
+        elapsed = self._times[end - 1] - self._times[start]
+        if elapsed <= 0:
+            return 0.0, 0.0
+        vx, vy = (self._points[end - 1] - self._points[start]) / elapsed
+        return vx, vy
+
+    def covers(self, duration):
+        """
+        轨迹已经覆盖了 duration 秒（缓冲区存满也算）
+        """
+        if self._count == 0:
+            return False
+        start, end = self._span(self._count)
+        return self.is_full() or self._times[end - 1] - self._times[start] >= duration
+
+    def latest(self):
+        """
+        最近一个有效点，还没有时返回 None
+        """
+        if self._count == 0 or np.isnan(self._last_point[0]):
+            return None
+        return self._last_point
+
+    def latest_time(self):
+        """
+        最近一个有效点的采集时间戳，还没有时返回 None
+        """
+        if self.latest() is None:
+            return None
+        return self._last_time
+
+    def is_full(self):
+        return self._count == self.capacity
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        return self.points[index]